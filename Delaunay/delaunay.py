@@ -0,0 +1,785 @@
+from array import array
+from fractions import Fraction
+from random import Random
+
+import numpy as np
+
+from geometry import kernels, predicates
+from insertion_order import insertion_order
+
+# geometric kernels are shared with Fortune's construction
+orient2d = kernels.orient2d
+orient2dArray = kernels.orient2dArray
+incircle = kernels.incircle
+inpower = kernels.inpower
+circumcenter = kernels.circumcenter
+
+"""
+Delaunay triangulation (incremental insertion with edge flips) and its dual Voronoi diagram.
+
+Triangles are kept in flat integer tables instead of [p1,p2,p3,ngh1,ngh2,ngh3] lists:
+vertices[3t:3t+3] are indices of points of triangle t in counter clockwise order and
+neighbours[3t+i] is the triangle lying opposite to vertex i (across edge vertices[3t+i+1], vertices[3t+i+2]),
+-1 if there is none. Removed triangles have -1 vertices and their slots are reused by next insertions.
+Points may have weights - RegularTriangulation is dual to power diagram instead of Voronoi diagram.
+Vertices of super triangle have coordinates only for point location - in circle tests they are infinitely far,
+so they never change triangles of given points and triangles left after removing them cover the convex hull.
+Orientation and in circle tests are exact (see geometry/predicates.py), so duplicates, points on edges
+and cocircular points are recognized without tolerances.
+"""
+
+
+# orientation of abc - positive if counter clockwise, negative if clockwise, 0 if collinear
+det = orient2d
+
+# positive if d lies inside circle circumscribed on counter clockwise triangle abc, 0 if on it
+in_circle = incircle
+
+# in_circle for weighted points (x, y, w) - positive if d lifted to x^2 + y^2 - w lies below plane through lifted abc
+in_power = inpower
+
+
+# det for numpy arrays of points, compiled if numba is installed (see geometry/kernels.py)
+det_array = orient2dArray
+
+
+center_of_circumcircle = circumcenter
+
+
+# direction in which circle through a point and two vertices of super triangle (moved to infinity) contains
+# other points - circumcenter of origin and directions (-20, -1), (20, -1), (0, 20) of the two vertices,
+# by offsets of the vertices from n
+SUPER_EDGE_DIRECTIONS = {(0, 1): (0, -1), (1, 2): (421, 400), (0, 2): (-421, 400)}
+
+
+class Triangulation:
+    def __init__(self, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.n = len(points)  # number of given points, vertices of super triangle have indices n, n + 1, n + 2
+
+        self.x = array('d', np.ascontiguousarray(points[:, 0]).tobytes())
+        self.y = array('d', np.ascontiguousarray(points[:, 1]).tobytes())
+
+        self.vertices = array('q')
+        self.neighbours = array('q')
+        self.free = []  # type: list[int]  # slots of removed triangles
+
+        self.last = 0  # recently created triangle, start of point location walk
+        self.random = Random(0)
+
+        # triangle containing all given points
+        minX, minY = points.min(axis=0) if self.n > 0 else (0, 0)
+        maxX, maxY = points.max(axis=0) if self.n > 0 else (0, 0)
+        centerX = (minX + maxX) / 2
+        centerY = (minY + maxY) / 2
+        d = self.super_size(points)
+
+        for x, y in ((centerX - 20 * d, centerY - d), (centerX + 20 * d, centerY - d), (centerX, centerY + 20 * d)):
+            self.x.append(x)
+            self.y.append(y)
+
+        self.super = (self.n, self.n + 1, self.n + 2)
+        self.add_triangle(self.n, self.n + 1, self.n + 2, -1, -1, -1)
+
+    def super_size(self, points) -> float:
+        """size of box around points, super triangle is 20 times larger"""
+        if self.n == 0:
+            return 1.0
+        extent = points.max(axis=0) - points.min(axis=0)
+        return max(extent.max(), 1.0)
+
+    def alloc(self) -> int:
+        if self.free:
+            return self.free.pop()
+        self.vertices.extend((-1, -1, -1))
+        self.neighbours.extend((-1, -1, -1))
+        return len(self.vertices) // 3 - 1
+
+    def set_triangle(self, t, a, b, c, na, nb, nc):
+        i = 3 * t
+        self.vertices[i] = a
+        self.vertices[i + 1] = b
+        self.vertices[i + 2] = c
+        self.neighbours[i] = na
+        self.neighbours[i + 1] = nb
+        self.neighbours[i + 2] = nc
+
+    def add_triangle(self, a, b, c, na, nb, nc) -> int:
+        t = self.alloc()
+        self.set_triangle(t, a, b, c, na, nb, nc)
+        return t
+
+    def remove_triangle(self, t):
+        self.set_triangle(t, -1, -1, -1, -1, -1, -1)
+        self.free.append(t)
+
+    def change_ngh(self, t, fromT, toT):
+        """in triangle t replaces neighbour fromT with toT"""
+        if t == -1:
+            return
+        i = 3 * t
+        for j in range(i, i + 3):
+            if self.neighbours[j] == fromT:
+                self.neighbours[j] = toT
+                return
+
+    def vertex_table(self) -> np.ndarray:
+        return np.frombuffer(self.vertices, dtype=np.int64).reshape(-1, 3)
+
+    def neighbour_table(self) -> np.ndarray:
+        return np.frombuffer(self.neighbours, dtype=np.int64).reshape(-1, 3)
+
+    def coordinates(self) -> np.ndarray:
+        """coordinates of all points including super triangle, as (n + 3, 2) array"""
+        return np.column_stack((np.frombuffer(self.x), np.frombuffer(self.y)))
+
+    def jump(self, px, py) -> int:
+        """
+        returns start triangle for walk - the closest to point out of last created triangle
+        and about n^(1/3) randomly chosen ones (distance measured to their first vertex)
+        """
+        x = self.x
+        y = self.y
+        vertices = self.vertices
+        slots = len(vertices) // 3
+
+        best = self.last if vertices[3 * self.last] >= 0 else 0
+        v = vertices[3 * best]
+        bestDist = (x[v] - px) ** 2 + (y[v] - py) ** 2
+
+        for _ in range(int(slots ** (1 / 3))):
+            t = self.random.randrange(slots)
+            v = vertices[3 * t]
+            if v < 0:
+                continue
+            dist = (x[v] - px) ** 2 + (y[v] - py) ** 2
+            if dist < bestDist:
+                best = t
+                bestDist = dist
+
+        return best
+
+    def walk(self, t, px, py) -> int:
+        """
+        visibility walk from triangle t - crosses any edge having point on its outer side,
+        returns triangle containing point or -1 if walk did not finish in number of steps equal to number of slots
+        """
+        x = self.x
+        y = self.y
+        vertices = self.vertices
+        neighbours = self.neighbours
+
+        previous = -1
+        for _ in range(len(vertices) // 3 + 1):
+            i = 3 * t
+            # edges are checked starting from random one, so walk can not loop on degenerate triangulations,
+            # edge shared with previous triangle has point on its inner side (it was crossed), it is not tested again
+            start = self.random.randrange(3)
+            for k in range(3):
+                j = (start + k) % 3
+                if neighbours[i + j] == previous:
+                    continue
+                a = vertices[i + (j + 1) % 3]
+                b = vertices[i + (j + 2) % 3]
+                if det(x[a], y[a], x[b], y[b], px, py) < 0 and neighbours[i + j] != -1:
+                    previous = t
+                    t = neighbours[i + j]
+                    break
+            else:
+                return t
+
+        return -1
+
+    def locate(self, px, py) -> int:
+        """returns live triangle containing point (or having it on its edge)"""
+        t = self.walk(self.jump(px, py), px, py)
+        if t == -1:
+            t = self.find_triangle(px, py)
+        return t
+
+    def edge_orientations(self, t, px, py) -> tuple[float, float, float]:
+        """det of point against every edge of triangle t, i-th for edge opposite to i-th vertex"""
+        x = self.x
+        y = self.y
+        i = 3 * t
+        a, b, c = self.vertices[i], self.vertices[i + 1], self.vertices[i + 2]
+        return (det(x[b], y[b], x[c], y[c], px, py),
+                det(x[c], y[c], x[a], y[a], px, py),
+                det(x[a], y[a], x[b], y[b], px, py))
+
+    def orientations(self, triangles, px, py) -> np.ndarray:
+        """edge_orientations of point for array of k live triangles at once, as (k, 3) array"""
+        V = self.vertex_table()[triangles]
+        X = np.frombuffer(self.x)[V]
+        Y = np.frombuffer(self.y)[V]
+        return det_array(X[:, [1, 2, 0]], Y[:, [1, 2, 0]], X[:, [2, 0, 1]], Y[:, [2, 0, 1]], px, py)
+
+    def find_triangle(self, px, py) -> int:
+        """returns live triangle containing point (or having it on its edge), checks all triangles"""
+        live = np.flatnonzero(self.vertex_table()[:, 0] >= 0)
+
+        # triangle with greatest minimal orientation - inside if >= 0
+        return int(live[np.argmax(self.orientations(live, px, py).min(axis=1))])
+
+    def add_point(self, px, py) -> int:
+        """adds new point (must lie inside super triangle) to triangulation, returns its index"""
+        x = self.x
+        y = self.y
+        a, b, c = self.super
+        if det(x[a], y[a], x[b], y[b], px, py) <= 0 or det(x[b], y[b], x[c], y[c], px, py) <= 0 or \
+                det(x[c], y[c], x[a], y[a], px, py) <= 0:
+            raise ValueError("point lies outside of super triangle")
+
+        x.append(px)
+        y.append(py)
+        p = len(x) - 1
+        self.insert_point(p)
+        return p
+
+    def star(self, v) -> list[int]:
+        """triangles around vertex v (not lying on super triangle) in counter clockwise order"""
+        start = t = self.locate(self.x[v], self.y[v])
+        if v not in self.vertices[3 * t:3 * t + 3]:
+            raise ValueError("point " + str(v) + " is not a vertex of triangulation")
+
+        result = []
+        while True:
+            result.append(t)
+            k = self.vertices[3 * t:3 * t + 3].index(v)
+            # neighbour across edge from v to third vertex of t
+            t = self.neighbours[3 * t + (k + 1) % 3]
+            if t == start:
+                return result
+
+    def remove_point(self, v):
+        """removes vertex v, hole left by its triangles is triangulated again by Delaunay ears"""
+        if v in self.super:
+            raise ValueError("vertices of super triangle can not be removed")
+
+        vertices = self.vertices
+        neighbours = self.neighbours
+
+        # polygon around v - edge i goes from link[i] to link[i + 1], outer[i] is triangle on the other side
+        # and neighbours[slot[i]] is its reference to the triangle inside polygon
+        link = []
+        outer = []
+        slot = []
+        star = self.star(v)
+        for t in star:
+            k = vertices[3 * t:3 * t + 3].index(v)
+            o = neighbours[3 * t + k]
+            link.append(vertices[3 * t + (k + 1) % 3])
+            outer.append(o)
+            slot.append(-1 if o == -1 else 3 * o + neighbours[3 * o:3 * o + 3].index(t))
+
+        for t in star:
+            self.remove_triangle(t)
+
+        while len(link) > 3:
+            i = self.find_ear(link)
+            k = len(link)
+            prev = (i - 1) % k
+            t = self.alloc()
+            self.set_triangle(t, link[prev], link[i], link[(i + 1) % k], outer[i], -1, outer[prev])
+            for j in (i, prev):
+                if slot[j] != -1:
+                    neighbours[slot[j]] = t
+
+            # cut off ear - its new edge closes polygon, reference to triangle across it is filled later
+            outer[prev] = t
+            slot[prev] = 3 * t + 1
+            del link[i], outer[i], slot[i]
+
+        t = self.alloc()
+        self.set_triangle(t, link[0], link[1], link[2], outer[1], outer[2], outer[0])
+        for j in range(3):
+            if slot[j] != -1:
+                neighbours[slot[j]] = t
+        self.last = t
+
+    def find_ear(self, link) -> int:
+        """returns i such that triangle link[i - 1], link[i], link[i + 1] is convex and its circumcircle is empty"""
+        x = self.x
+        y = self.y
+        k = len(link)
+        best = -1
+        bestViolation = np.inf
+
+        for i in range(k):
+            a, b, c = link[i - 1], link[i], link[(i + 1) % k]
+            if det(x[a], y[a], x[b], y[b], x[c], y[c]) <= 0:
+                continue
+
+            violation = max(self.circle_test(a, b, c, d) for d in link if d != a and d != b and d != c)
+            if violation <= 0:
+                return i
+            # only because of rounding errors
+            if violation < bestViolation:
+                best = i
+                bestViolation = violation
+
+        return best
+
+    def circle_test(self, a, b, c, d):
+        """in_circle for points with indices a, b, c, d, vertices of super triangle are infinitely far"""
+        n = self.n
+        if n <= a < n + 3 or n <= b < n + 3 or n <= c < n + 3 or n <= d < n + 3:
+            return self.super_circle_test(a, b, c, d)
+        return self.finite_circle_test(a, b, c, d)
+
+    def finite_circle_test(self, a, b, c, d):
+        x = self.x
+        y = self.y
+        return in_circle(x[a], y[a], x[b], y[b], x[c], y[c], x[d], y[d])
+
+    def lift(self, v) -> float:
+        """weight of point v, subtracted from x^2 + y^2 when points are lifted"""
+        return 0.0
+
+    def super_circle_test(self, a, b, c, d):
+        """
+        circle test with vertices of super triangle moved to infinity in their directions - such vertex lies
+        outside of circle through given points, circle through given points u, v and vertex of super triangle
+        becomes half plane bounded by line uv on the side of the vertex, and circle through given point u
+        and two vertices of super triangle becomes half plane of points lying further than u
+        in direction depending only on the two vertices
+        """
+        x = self.x
+        y = self.y
+        n = self.n
+        infinite = [v - n for v in (a, b, c) if n <= v < n + 3]
+        dInfinite = n <= d < n + 3
+
+        if not infinite:
+            return -1.0
+        if len(infinite) == 3:
+            return 1.0
+
+        if len(infinite) == 1:
+            # u, v, vertex of super triangle in counter clockwise order
+            if n <= c < n + 3:
+                u, v = a, b
+            elif n <= a < n + 3:
+                u, v = b, c
+            else:
+                u, v = c, a
+            side = det(x[u], y[u], x[v], y[v], x[d], y[d])
+            if side != 0 or dInfinite:
+                return side
+            return self.collinear_circle_test(u, v, d)
+
+        if dInfinite:
+            # the third vertex of super triangle, on the other side
+            return -1.0
+        u = next(v for v in (a, b, c) if not n <= v < n + 3)
+        dx, dy = SUPER_EDGE_DIRECTIONS[tuple(sorted(infinite))]
+        return predicates.toFloat((Fraction(x[d]) - Fraction(x[u])) * dx + (Fraction(y[d]) - Fraction(y[u])) * dy)
+
+    def collinear_circle_test(self, u, v, d):
+        """
+        circle test of d lying on line uv against half plane of u, v and vertex of super triangle - positive
+        if lifted d lies below segment between lifted u and v (if points are not weighted, d lies between u and v)
+        """
+        x = self.x
+        y = self.y
+        axis = x if x[u] != x[v] else y
+        su, sv, sd = (Fraction(axis[i]) for i in (u, v, d))
+        zu, zv, zd = (Fraction(x[i]) ** 2 + Fraction(y[i]) ** 2 - Fraction(self.lift(i)) for i in (u, v, d))
+        value = (sv - sd) * zu + (sd - su) * zv - (sv - su) * zd
+        return predicates.toFloat(value if sv > su else -value)
+
+    def insert_point(self, p):
+        """inserts point with index p to triangulation"""
+        self.insert_into(self.locate(self.x[p], self.y[p]), p)
+
+    def insert_into(self, t, p):
+        """inserts point p lying inside triangle t or on its edge"""
+        dets = self.edge_orientations(t, self.x[p], self.y[p])
+
+        onEdges = [i for i in range(3) if dets[i] == 0]
+        if len(onEdges) > 1:
+            # point already in triangulation
+            return
+
+        if not onEdges:
+            self.split_triangle(t, p)
+        else:
+            self.split_edge(t, onEdges[0], p)
+
+    def split_triangle(self, t, p):
+        a, b, c = self.vertices[3 * t:3 * t + 3]
+        na, nb, nc = self.neighbours[3 * t:3 * t + 3]
+
+        # t is reused by the first new triangle
+        t1, t2 = self.alloc(), self.alloc()
+
+        self.set_triangle(t, p, b, c, na, t1, t2)
+        self.set_triangle(t1, p, c, a, nb, t2, t)
+        self.set_triangle(t2, p, a, b, nc, t, t1)
+
+        self.change_ngh(nb, t, t1)
+        self.change_ngh(nc, t, t2)
+
+        for newT in (t, t1, t2):
+            self.legalize(newT)
+        self.last = t
+
+    def split_edge(self, t, i, p):
+        """splits triangle t and its neighbour by point p lying on edge opposite to i-th vertex of t"""
+        a, b, c = (self.vertices[3 * t + (i + k) % 3] for k in range(3))
+        _, nb, nc = (self.neighbours[3 * t + (i + k) % 3] for k in range(3))
+        u = self.neighbours[3 * t + i]
+
+        if u == -1:
+            # edge of super triangle, can happen only because of rounding errors
+            self.split_triangle(t, p)
+            return
+
+        j = self.neighbours[3 * u:3 * u + 3].index(t)
+        d = self.vertices[3 * u + j]
+        ub = self.neighbours[3 * u + (j + 1) % 3]
+        uc = self.neighbours[3 * u + (j + 2) % 3]
+
+        # t and u are reused by new triangles on their sides of edge
+        t1, t3 = self.alloc(), self.alloc()
+
+        self.set_triangle(t, p, c, a, nb, t1, t3)
+        self.set_triangle(t1, p, a, b, nc, u, t)
+        self.set_triangle(u, p, b, d, ub, t3, t1)
+        self.set_triangle(t3, p, d, c, uc, t, u)
+
+        self.change_ngh(nc, t, t1)
+        self.change_ngh(uc, u, t3)
+
+        for newT in (t, t1, u, t3):
+            self.legalize(newT)
+        self.last = t
+
+    def legalize(self, t):
+        """
+        flips edge opposite to first vertex of t if it is not locally Delaunay, then edges of triangles made
+        by flips - triangles waiting for check are kept on explicit stack, not in recursion
+        """
+        stack = [t]
+        while stack:
+            stack.extend(self.legalize_edge(stack.pop()))
+
+    def legalize_edge(self, t) -> tuple[int, ...]:
+        """flips edge opposite to first vertex of t if it is not locally Delaunay, returns triangles made by flip"""
+        u = self.neighbours[3 * t]
+        if u == -1:
+            return ()
+
+        x = self.x
+        y = self.y
+        p, b, c = self.vertices[3 * t:3 * t + 3]
+        j = self.neighbours[3 * u:3 * u + 3].index(t)
+        d = self.vertices[3 * u + j]
+
+        n = self.n
+        if n <= b < n + 3 or n <= c < n + 3 or n <= d < n + 3:
+            # symbolic test may ask for flip of quadrilateral which is not convex in coordinates of super triangle
+            if self.super_circle_test(p, b, c, d) <= 0 or det(x[p], y[p], x[b], y[b], x[d], y[d]) <= 0 or \
+                    det(x[p], y[p], x[d], y[d], x[c], y[c]) <= 0:
+                return ()
+        elif in_circle(x[p], y[p], x[b], y[b], x[c], y[c], x[d], y[d]) <= 0:
+            return ()
+
+        return self.flip(t, u, j)
+
+    def flip(self, t, u, j) -> tuple[int, int]:
+        """
+        replaces triangle t = pbc and its neighbour u (with vertex d opposite to t at position j)
+        by triangles pbd and pdc, written in place of t and u
+        """
+        p, b, c = self.vertices[3 * t:3 * t + 3]
+        d = self.vertices[3 * u + j]
+        tb = self.neighbours[3 * t + 1]
+        tc = self.neighbours[3 * t + 2]
+        ub = self.neighbours[3 * u + (j + 1) % 3]
+        uc = self.neighbours[3 * u + (j + 2) % 3]
+
+        self.set_triangle(t, p, b, d, ub, u, tc)
+        self.set_triangle(u, p, d, c, uc, tb, t)
+
+        self.change_ngh(ub, u, t)
+        self.change_ngh(tb, t, u)
+
+        return t, u
+
+
+class RegularTriangulation(Triangulation):
+    """
+    triangulation of weighted points, dual to their power diagram - edge is flipped when lifted test (in_power)
+    fails, points whose power cell is empty (redundant) are left out of triangulation and kept in hidden
+    """
+
+    def __init__(self, points, weights):
+        self.weights = np.asarray(weights, dtype=float).reshape(-1)
+        super().__init__(points)
+        if len(self.weights) != self.n:
+            raise ValueError("number of weights differs from number of points")
+
+        self.w = array('d', self.weights.tobytes())
+        self.w.extend((0.0, 0.0, 0.0))  # vertices of super triangle
+        self.hidden = set()  # type: set[int]
+
+    def add_point(self, px, py, weight=0.0) -> int:
+        self.w.append(weight)
+        try:
+            return super().add_point(px, py)
+        except ValueError:
+            self.w.pop()
+            raise
+
+    def finite_circle_test(self, a, b, c, d):
+        x = self.x
+        y = self.y
+        w = self.w
+        return in_power(x[a], y[a], w[a], x[b], y[b], w[b], x[c], y[c], w[c], x[d], y[d], w[d])
+
+    def lift(self, v) -> float:
+        return self.w[v]
+
+    def insert_into(self, t, p):
+        x = self.x
+        y = self.y
+        w = self.w
+        a, b, c = self.vertices[3 * t:3 * t + 3]
+
+        for v in (a, b, c):
+            if x[v] == x[p] and y[v] == y[p]:
+                # of two points at the same place only the heavier one has nonempty cell
+                if w[p] <= w[v]:
+                    self.hidden.add(p)
+                else:
+                    self.replace_vertex(v, p)
+                return
+
+        if self.circle_test(a, b, c, p) <= 0:
+            self.hidden.add(p)
+            return
+
+        super().insert_into(t, p)
+
+    def replace_vertex(self, v, p):
+        """puts p (at the same place as v, with greater weight) in place of v, v becomes hidden"""
+        star = self.star(v)
+        for t in star:
+            k = self.vertices[3 * t:3 * t + 3].index(v)
+            a, b = self.vertices[3 * t + (k + 1) % 3], self.vertices[3 * t + (k + 2) % 3]
+            na, nb, nc = (self.neighbours[3 * t + (k + i) % 3] for i in range(3))
+            self.set_triangle(t, p, a, b, na, nb, nc)
+        self.hidden.add(v)
+
+        # p is lower than v after lifting, so only edges opposite to it may be not regular
+        for t in star:
+            self.legalize(t)
+
+    def remove_point(self, v):
+        """removes vertex v, points hidden by it are inserted again"""
+        if v in self.hidden:
+            self.hidden.discard(v)
+            return
+
+        super().remove_point(v)
+        hidden = sorted(self.hidden)
+        self.hidden.clear()
+        for p in hidden:
+            self.insert_point(p)
+
+    def legalize_edge(self, t) -> tuple[int, ...]:
+        """
+        flips edge opposite to first vertex p of t if it is not regular, if quadrilateral of t and its
+        neighbour is not convex, its reflex vertex is removed together with the edge, when it has only three
+        triangles (otherwise the edge is flipped later, after flips around p take other triangles of the vertex),
+        returns triangles made by flip
+        """
+        u = self.neighbours[3 * t]
+        if u == -1:
+            return ()
+
+        x = self.x
+        y = self.y
+        vertices = self.vertices
+        neighbours = self.neighbours
+        p, b, c = vertices[3 * t:3 * t + 3]
+        j = neighbours[3 * u:3 * u + 3].index(t)
+        d = vertices[3 * u + j]
+
+        if self.circle_test(p, b, c, d) <= 0:
+            return ()
+
+        turnB = det(x[p], y[p], x[b], y[b], x[d], y[d])
+        turnC = det(x[p], y[p], x[d], y[d], x[c], y[c])
+        if turnB > 0 and turnC > 0:
+            return self.flip(t, u, j)
+
+        tb = neighbours[3 * t + 1]
+        tc = neighbours[3 * t + 2]
+        ub = neighbours[3 * u + (j + 1) % 3]
+        uc = neighbours[3 * u + (j + 2) % 3]
+        if turnB == 0 and b not in self.super and tc != -1 and ub != -1:
+            # b lies on segment pd, lifted above it - with two triangles pbe, bde on the other side
+            # it is removed, quadrilateral pedc is split by pd into triangles written in place of t and u
+            e = vertices[3 * tc + (vertices[3 * tc:3 * tc + 3].index(p) + 1) % 3]
+            if e not in vertices[3 * ub:3 * ub + 3]:
+                return ()
+            outerE = neighbours[3 * ub + vertices[3 * ub:3 * ub + 3].index(b)]
+            outerP = neighbours[3 * tc + vertices[3 * tc:3 * tc + 3].index(b)]
+            self.remove_triangle(tc)
+            self.remove_triangle(ub)
+            self.set_triangle(t, p, d, c, uc, tb, u)
+            self.set_triangle(u, p, e, d, outerE, t, outerP)
+            self.change_ngh(uc, u, t)
+            self.change_ngh(outerE, ub, u)
+            self.change_ngh(outerP, tc, u)
+            self.hidden.add(b)
+            self.last = t
+            return t, u
+
+        if turnC == 0 and c not in self.super and tb != -1 and uc != -1:
+            # the same for c lying on segment pd, with triangles cpe, dce on the other side
+            e = vertices[3 * tb + (vertices[3 * tb:3 * tb + 3].index(c) + 1) % 3]
+            if e not in vertices[3 * uc:3 * uc + 3]:
+                return ()
+            outerE = neighbours[3 * uc + vertices[3 * uc:3 * uc + 3].index(c)]
+            outerP = neighbours[3 * tb + vertices[3 * tb:3 * tb + 3].index(c)]
+            self.remove_triangle(tb)
+            self.remove_triangle(uc)
+            self.set_triangle(t, p, b, d, ub, u, tc)
+            self.set_triangle(u, p, d, e, outerE, outerP, t)
+            self.change_ngh(ub, u, t)
+            self.change_ngh(outerE, uc, u)
+            self.change_ngh(outerP, tb, u)
+            self.hidden.add(c)
+            self.last = t
+            return t, u
+
+        if turnB < 0 and b not in self.super and tc != -1 and d in vertices[3 * tc:3 * tc + 3]:
+            # b is inside triangle pdc, its triangles are t, u and tc
+            outer = neighbours[3 * tc + vertices[3 * tc:3 * tc + 3].index(b)]
+            removed, third = b, tc
+            corners = (p, d, c)
+            sides = ((uc, u), (tb, t), (outer, tc))  # neighbours of new triangle and triangles they touched
+        elif turnC < 0 and c not in self.super and tb != -1 and d in vertices[3 * tb:3 * tb + 3]:
+            # c is inside triangle pbd, its triangles are t, u and tb
+            outer = neighbours[3 * tb + vertices[3 * tb:3 * tb + 3].index(c)]
+            removed, third = c, tb
+            corners = (p, b, d)
+            sides = ((ub, u), (outer, tb), (tc, t))
+        else:
+            return ()
+
+        # new triangle is written in place of t
+        self.remove_triangle(u)
+        self.remove_triangle(third)
+        self.set_triangle(t, *corners, *(ngh for ngh, _ in sides))
+        for ngh, old in sides:
+            if old != t:
+                self.change_ngh(ngh, old, t)
+        self.hidden.add(removed)
+        self.last = t
+        return t,
+
+
+def triangulate(points, order=None, weights=None) -> Triangulation:
+    """
+    :param order: order of insertion - None (as given), 'hilbert' or 'brio', see insertion_order module
+    :param weights: weight of every point (power distance |x - p|^2 - w, e.g. squared radius), regular
+                    triangulation is built if given
+    """
+    triangulation = Triangulation(points) if weights is None else RegularTriangulation(points, weights)
+    for p in insertion_order(triangulation.coordinates()[:triangulation.n], order).tolist():
+        triangulation.insert_point(p)
+
+    return triangulation
+
+
+def delaunay(points, order=None, weights=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    :param points: (n, 2) array or list of (x, y)
+    :param order: order of insertion - None (as given), 'hilbert' or 'brio'
+    :param weights: weights of points, regular triangulation (dual to power diagram) is returned if given,
+                    points with empty power cell are not vertices of any triangle
+    :return: (m, 3) array of point indices of triangles and (m, 3) array of their neighbours
+             (neighbour i lies opposite to vertex i, -1 if there is none)
+    """
+    triangulation = triangulate(points, order, weights)
+    V = triangulation.vertex_table()
+    N = triangulation.neighbour_table()
+
+    # removing empty slots and triangles containing vertices of super triangle
+    keep = (V[:, 0] >= 0) & ~np.isin(V, triangulation.super).any(axis=1)
+    newIndex = np.full(len(V) + 1, -1, dtype=np.int64)  # last element maps -1 to -1
+    newIndex[:-1][keep] = np.arange(np.count_nonzero(keep))
+
+    return V[keep].copy(), newIndex[N[keep]]
+
+
+def triangles_to_lines(points, triangles) -> np.ndarray:
+    """returns (k, 2, 2) array of edges of triangles, every edge once"""
+    points = np.asarray(points, dtype=float)
+    edges = np.concatenate((triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]))
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+
+    return points[edges]
+
+
+def ray_box_exit(x, y, dx, dy, lower_left, upper_right):
+    """points where rays from (x, y) in directions (dx, dy) leave the box, for numbers or arrays of rays"""
+    x, y, dx, dy = (np.asarray(value, dtype=float) for value in (x, y, dx, dy))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tx = np.where(dx > 0, (upper_right[0] - x) / dx, np.where(dx < 0, (lower_left[0] - x) / dx, np.inf))
+        ty = np.where(dy > 0, (upper_right[1] - y) / dy, np.where(dy < 0, (lower_left[1] - y) / dy, np.inf))
+
+    t = np.maximum(np.minimum(tx, ty), 0)
+    return x + t * dx, y + t * dy
+
+
+def circumcenters(points, triangles, weights=None) -> np.ndarray:
+    """
+    (m, 2) array of centers of circumcircles (power centers if weights are given) of all triangles, every one
+    computed once, in floats - only orientation of triangles is exact
+    """
+    points = np.asarray(points, dtype=float)
+    a = points[triangles[:, 0]]
+    b = points[triangles[:, 1]]
+    c = points[triangles[:, 2]]
+    # orientation of given points, differences below are rounded and may be collinear when the points are not
+    d = 2 * det_array(a[:, 0], a[:, 1], b[:, 0], b[:, 1], c[:, 0], c[:, 1])
+    b = b - a
+    c = c - a
+    b2 = (b * b).sum(axis=1)
+    c2 = (c * c).sum(axis=1)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+        b2 -= weights[triangles[:, 1]] - weights[triangles[:, 0]]
+        c2 -= weights[triangles[:, 2]] - weights[triangles[:, 0]]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return a + np.column_stack((c[:, 1] * b2 - b[:, 1] * c2, b[:, 0] * c2 - c[:, 0] * b2)) / d[:, None]
+
+
+def voronoi_diagram(points, triangles, neighbours, lower_left, upper_right, weights=None):
+    """
+    :param weights: weights of points given to delaunay, power diagram is built if given
+    :return: (m, 2) array of Voronoi vertices (centers of circumcircles of triangles, or power centers,
+             indexed like triangles) and (k, 2, 2) array of Voronoi edges - first edges dual to edges between
+             two triangles, then edges going to infinity, cut on box given by lower_left and upper_right corners
+    """
+    points = np.asarray(points, dtype=float)
+    centers = circumcenters(points, triangles, weights)
+
+    # edge between neighbouring triangles, every one once - from triangle with lower index
+    t, i = np.nonzero(neighbours > np.arange(len(triangles))[:, None])
+    inner = np.stack((centers[t], centers[neighbours[t, i]]), axis=1)
+
+    # ray from center of circumcircle perpendicular to hull edge ab, going outside
+    t, i = np.nonzero(neighbours == -1)
+    a = points[triangles[t, (i + 1) % 3]]
+    b = points[triangles[t, (i + 2) % 3]]
+    cross = ray_box_exit(centers[t, 0], centers[t, 1], b[:, 1] - a[:, 1], a[:, 0] - b[:, 0], lower_left, upper_right)
+    rays = np.stack((centers[t], np.column_stack(cross)), axis=1)
+
+    return centers, np.concatenate((inner, rays))
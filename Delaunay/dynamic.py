@@ -0,0 +1,131 @@
+from array import array
+
+import numpy as np
+
+from delaunay import Triangulation, center_of_circumcircle
+from insertion_order import insertion_order
+
+"""
+Voronoi diagram kept alive between changes. Adding or removing a site changes only triangles around it,
+so circumcenters (Voronoi vertices) are stored per triangle slot and recomputed only for triangles
+created by the change. Cell of a site is read from centers of triangles around it and cut by the box.
+Cells of sites on convex hull are unbounded - triangles with vertices of super triangle have no finite
+center (super vertices are infinitely far in circle tests), so such cell is the box cut by bisectors
+between the site and its neighbour sites.
+"""
+
+
+def clip(polygon, nx, ny, c) -> list[tuple[float, float]]:
+    """part of convex polygon (counter clockwise list of points) lying in half-plane nx * x + ny * y <= c"""
+    result = []
+    for k in range(len(polygon)):
+        (px, py), (qx, qy) = polygon[k - 1], polygon[k]
+        p_side = nx * px + ny * py - c
+        q_side = nx * qx + ny * qy - c
+        if (p_side < 0 < q_side) or (q_side < 0 < p_side):
+            s = p_side / (p_side - q_side)
+            result.append((px + s * (qx - px), py + s * (qy - py)))
+        if q_side <= 0:
+            result.append((qx, qy))
+    return result
+
+
+def clip_to_box(polygon, lower_left, upper_right) -> list[tuple[float, float]]:
+    """part of convex polygon inside the box"""
+    for nx, ny, c in ((-1, 0, -lower_left[0]), (1, 0, upper_right[0]), (0, -1, -lower_left[1]),
+                      (0, 1, upper_right[1])):
+        polygon = clip(polygon, nx, ny, c)
+    return polygon
+
+
+class DynamicVoronoi(Triangulation):
+    def __init__(self, points, order=None, lower_left=None, upper_right=None):
+        """
+        :param lower_left, upper_right: corners of box cutting cells, box around points with margin
+                                        of tenth of their extent if not given
+        """
+        points = np.asarray(points, dtype=float)
+        margin = (points.max(axis=0) - points.min(axis=0)) / 10
+        self.lower_left = tuple((points.min(axis=0) - margin).tolist()) if lower_left is None else tuple(lower_left)
+        self.upper_right = tuple((points.max(axis=0) + margin).tolist()) if upper_right is None else tuple(upper_right)
+        self.centerX = array('d')
+        self.centerY = array('d')
+        self.changed = set()  # type: set[int]  # sites whose cells changed since last pop_changed
+        self.removed = set()  # type: set[int]
+
+        super().__init__(points)
+        self.sites = {}  # type: dict[tuple[float, float], int]  # site at given place, the first one of equal points
+        for i, site in enumerate(zip(self.x[:self.n], self.y[:self.n])):
+            self.sites.setdefault(site, i)
+        for p in insertion_order(self.coordinates()[:self.n], order).tolist():
+            self.insert_point(p)
+
+    def set_triangle(self, t, a, b, c, na, nb, nc):
+        super().set_triangle(t, a, b, c, na, nb, nc)
+
+        while len(self.centerX) <= t:
+            self.centerX.append(np.nan)
+            self.centerY.append(np.nan)
+        if a < 0:
+            return
+
+        x = self.x
+        y = self.y
+        try:
+            self.centerX[t], self.centerY[t] = center_of_circumcircle(x[a], y[a], x[b], y[b], x[c], y[c])
+        except ZeroDivisionError:
+            self.centerX[t] = self.centerY[t] = np.nan
+        self.changed.update((a, b, c))
+
+    def remove_triangle(self, t):
+        self.changed.update(self.vertices[3 * t:3 * t + 3])
+        super().remove_triangle(t)
+
+    def add_site(self, x, y) -> int:
+        """adds site, returns its index - index of existing site if there is one at the same place"""
+        if (x, y) in self.sites:
+            return self.sites[(x, y)]
+        i = self.add_point(x, y)
+        self.sites[(x, y)] = i
+        return i
+
+    def remove_site(self, i):
+        if i in self.removed:
+            raise ValueError("site " + str(i) + " was already removed")
+        self.remove_point(i)
+        self.removed.add(i)
+        self.changed.discard(i)
+        if self.sites.get((self.x[i], self.y[i])) == i:
+            del self.sites[(self.x[i], self.y[i])]
+
+    def cell(self, i) -> list[tuple[float, float]]:
+        """vertices of Voronoi cell of site i cut by the box, in counter clockwise order (empty if outside)"""
+        star = self.star(i)
+        if not any(v in self.super for t in star for v in self.vertices[3 * t:3 * t + 3]):
+            return clip_to_box([(self.centerX[t], self.centerY[t]) for t in star], self.lower_left, self.upper_right)
+
+        # site on convex hull, its cell is unbounded - box is cut by bisectors with all neighbour sites
+        x = self.x
+        y = self.y
+        (left, bottom), (right, top) = self.lower_left, self.upper_right
+        polygon = [(left, bottom), (right, bottom), (right, top), (left, top)]
+        for j in self.neighbour_sites(i):
+            nx, ny = x[j] - x[i], y[j] - y[i]
+            polygon = clip(polygon, nx, ny, (nx * (x[i] + x[j]) + ny * (y[i] + y[j])) / 2)
+        return polygon
+
+    def neighbour_sites(self, i) -> list[int]:
+        """sites whose cells share an edge with cell of site i"""
+        result = []
+        for t in self.star(i):
+            k = self.vertices[3 * t:3 * t + 3].index(i)
+            v = self.vertices[3 * t + (k + 1) % 3]
+            if v not in self.super:
+                result.append(v)
+        return result
+
+    def pop_changed(self) -> set[int]:
+        """returns sites whose cells changed since last call"""
+        changed = {i for i in self.changed if i not in self.super}
+        self.changed = set()
+        return changed
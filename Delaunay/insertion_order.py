@@ -0,0 +1,87 @@
+import numpy as np
+
+"""
+Insertion orders for incremental construction. Points close on Hilbert curve are close on the plane,
+so the walk locating next point starts near it and stays short.
+BRIO (biased randomized insertion order) inserts points in rounds of doubling size, every round sorted along the curve -
+random enough to keep expected number of flips low, local enough to keep walks short.
+"""
+
+ORDERS = (None, 'hilbert', 'brio')
+
+
+def hilbert_index(points, order=16) -> np.ndarray:
+    """index of every point on Hilbert curve filling bounding box of points, divided into 2^order x 2^order cells"""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.int64)
+    n = 1 << order
+
+    low = points.min(axis=0)
+    size = max((points.max(axis=0) - low).max(), 1e-300)
+    cells = ((points - low) / size * (n - 1)).astype(np.int64)
+    x = cells[:, 0]
+    y = cells[:, 1]
+
+    d = np.zeros(len(points), dtype=np.int64)
+    s = n >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+
+        # rotating quadrant, so curve inside it starts and ends in right corners
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+
+    return d
+
+
+def hilbert_order(points) -> np.ndarray:
+    """permutation sorting points along Hilbert curve"""
+    return np.argsort(hilbert_index(points), kind='stable')
+
+
+def brio_order(points, seed=0) -> np.ndarray:
+    """permutation of points in biased randomized insertion order, rounds sorted along Hilbert curve"""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    rng = np.random.default_rng(seed)
+
+    # every point lands in last round with probability 1/2, in the one before with 1/4 and so on
+    rounds = np.floor(-np.log2(1 - rng.random(len(points)))).astype(np.int64)
+    return np.lexsort((hilbert_index(points), -rounds))
+
+
+def insertion_order(points, order=None) -> np.ndarray:
+    """
+    :param order: None (order given by caller), 'hilbert' or 'brio'
+    :return: permutation of point indices
+    """
+    if order is None:
+        return np.arange(len(points))
+    if order == 'hilbert':
+        return hilbert_order(points)
+    if order == 'brio':
+        return brio_order(points)
+    raise ValueError("unknown insertion order: " + str(order))
+
+
+if __name__ == '__main__':
+    from time import time
+
+    from delaunay import triangulate
+
+    rng = np.random.default_rng(0)
+    n = 20000
+    uniform = rng.uniform(0, 1000, (n, 2))
+    centers = rng.uniform(0, 1000, (20, 2))
+    clustered = centers[rng.integers(0, 20, n)] + rng.normal(0, 5, (n, 2))
+
+    for name, points in (("uniform", uniform), ("clustered", clustered)):
+        for order in ORDERS:
+            start = time()
+            triangulate(points, order)
+            print(name, order, time() - start)
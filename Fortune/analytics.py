@@ -0,0 +1,63 @@
+import numpy as np
+
+from clipping import CellPolygons
+from diagram import Diagram
+
+"""
+Per site values computed over the whole diagram at once: area and centroid of cells (from closed polygons,
+see clipping module) and neighbours - sites whose cells share an edge, read from twin half edges.
+"""
+
+
+def polygonTerms(polygons: CellPolygons):
+    """cell of every polygon vertex and cross product of the vertex with the next one in its polygon"""
+    counts = np.diff(polygons.offsets)
+    cell = np.repeat(np.arange(len(counts)), counts)
+    following = np.arange(len(cell)) + 1
+    last = polygons.offsets[1:][counts > 0] - 1
+    following[last] = polygons.offsets[:-1][counts > 0]
+
+    x, y = polygons.x, polygons.y
+    cross = x * y[following] - x[following] * y
+    return cell, following, cross
+
+
+def cellAreas(polygons: CellPolygons) -> np.ndarray:
+    cell, _, cross = polygonTerms(polygons)
+    return np.bincount(cell, weights=cross, minlength=len(polygons)) / 2
+
+
+def cellCentroids(polygons: CellPolygons) -> np.ndarray:
+    """(n, 2) array of centroids, for degenerate (flat) cells mean of their vertices"""
+    cell, following, cross = polygonTerms(polygons)
+    n = len(polygons)
+    x, y = polygons.x, polygons.y
+
+    area = np.bincount(cell, weights=cross, minlength=n) / 2
+    sumX = np.bincount(cell, weights=(x + x[following]) * cross, minlength=n)
+    sumY = np.bincount(cell, weights=(y + y[following]) * cross, minlength=n)
+
+    counts = np.maximum(np.diff(polygons.offsets), 1)
+    meanX = np.bincount(cell, weights=x, minlength=n) / counts
+    meanY = np.bincount(cell, weights=y, minlength=n) / counts
+
+    flat = area == 0
+    safeArea = np.where(flat, 1, area)
+    return np.column_stack((np.where(flat, meanX, sumX / (6 * safeArea)),
+                            np.where(flat, meanY, sumY / (6 * safeArea))))
+
+
+def neighbourGraph(diagram: Diagram) -> tuple[np.ndarray, np.ndarray]:
+    """
+    neighbours of all sites in CSR form
+    :return: offsets and adjacent - neighbours of site i are adjacent[offsets[i]:offsets[i + 1]], sorted
+    """
+    edgeSite = np.frombuffer(diagram.edgeSite, dtype=np.int64)
+    edgeTwin = np.frombuffer(diagram.edgeTwin, dtype=np.int64)
+    hasTwin = edgeTwin >= 0
+    pairs = np.column_stack((edgeSite[hasTwin], edgeSite[edgeTwin[hasTwin]]))
+    pairs = np.unique(pairs[pairs[:, 0] != pairs[:, 1]], axis=0)
+
+    counts = np.bincount(pairs[:, 0], minlength=diagram.siteCount())
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    return offsets, pairs[:, 1]
@@ -0,0 +1,202 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from dataTypes import Point
+from diagram import Diagram
+from voronoiFortunemethod import Voronoi
+
+"""
+Many small independent diagrams built in one call. Sets of sites are given as one ragged array - sites of set i
+are coords[offsets[i]:offsets[i + 1]] - and the result is one DiagramBatch with combined tables of all diagrams.
+
+Sets are divided into chunks of about CHUNK_SITES sites, solved in a process pool. One worker solves its whole
+chunk with a single BatchVoronoi, which reuses its event queue and tables and writes all diagrams of the chunk
+into one Diagram, so a set of few dozens of sites costs only its sweep. Boxes of all sets are computed
+at once with numpy.
+"""
+
+CHUNK_SITES = 1 << 14  # sites solved by one task of the pool
+TABLES = ('edgeSite', 'edgeStart', 'edgeEnd', 'edgeTwin', 'edgeNext', 'edgePrev')
+
+
+class DiagramBatch:
+    """
+    diagrams of all sets in combined tables - elements of diagram i are sites siteOffsets[i]:siteOffsets[i + 1],
+    vertices vertexOffsets[i]:vertexOffsets[i + 1] and half edges edgeOffsets[i]:edgeOffsets[i + 1],
+    indices stored in edge tables point to combined tables (e.g. edgeStart indexes vertexX), -1 if missing
+    """
+
+    def __init__(self, siteOffsets: np.ndarray, vertexOffsets: np.ndarray, edgeOffsets: np.ndarray,
+                 sites: np.ndarray, vertices: np.ndarray, edges: dict[str, np.ndarray], bounds: np.ndarray):
+        self.siteOffsets = siteOffsets
+        self.vertexOffsets = vertexOffsets
+        self.edgeOffsets = edgeOffsets
+        self.siteX, self.siteY = sites[:, 0], sites[:, 1]
+        self.vertexX, self.vertexY = vertices[:, 0], vertices[:, 1]
+        for name in TABLES:
+            setattr(self, name, edges[name])
+        self.bounds = bounds  # (k, 4) lower left x, y and upper right x, y of box of every diagram
+
+    def __len__(self):
+        return len(self.siteOffsets) - 1
+
+    def getBounds(self, i: int) -> tuple[Point, Point]:
+        minX, minY, maxX, maxY = self.bounds[i].tolist()
+        return Point(minX, minY), Point(maxX, maxY)
+
+    def diagram(self, i: int) -> Diagram:
+        """diagram i alone, with its own numbering of elements"""
+        diagram = Diagram()
+        sites = slice(self.siteOffsets[i], self.siteOffsets[i + 1])
+        vertices = slice(self.vertexOffsets[i], self.vertexOffsets[i + 1])
+        edges = slice(self.edgeOffsets[i], self.edgeOffsets[i + 1])
+
+        diagram.siteX.extend(self.siteX[sites].tolist())
+        diagram.siteY.extend(self.siteY[sites].tolist())
+        diagram.vertexX.extend(self.vertexX[vertices].tolist())
+        diagram.vertexY.extend(self.vertexY[vertices].tolist())
+        for name, first in zip(TABLES, (sites.start, vertices.start, vertices.start, edges.start, edges.start,
+                                        edges.start)):
+            table = getattr(self, name)[edges]
+            getattr(diagram, name).extend(np.where(table == -1, -1, table - first).tolist())
+        return diagram
+
+
+class BatchVoronoi(Voronoi):
+    """Voronoi solving many sets of sites one after another, all diagrams are appended to one Diagram"""
+
+    def __init__(self):
+        self.initSweep(Diagram())
+
+    def load(self, coords: list[list[float]], bounds: list[float]):
+        """prepares solve of next set, sites are numbered in order of coords"""
+        self.initSweep(self.diagram)
+
+        self.points = self.sites = [Point(x, y) for x, y in coords]
+        self.lowerLeft = Point(bounds[0], bounds[1])
+        self.upperRight = Point(bounds[2], bounds[3])
+        self.addSites()
+
+
+def batchBounds(offsets: np.ndarray, coords: np.ndarray) -> np.ndarray:
+    """(k, 4) boxes of all sets, the same as getBounds computes for every set alone"""
+    counts = np.diff(offsets)
+    bounds = np.zeros((len(counts), 4))
+    nonEmpty = np.flatnonzero(counts > 0)
+    if len(nonEmpty) == 0:
+        return bounds
+
+    low = np.minimum.reduceat(coords, offsets[nonEmpty], axis=0)
+    high = np.maximum.reduceat(coords, offsets[nonEmpty], axis=0)
+    # margins computed like in getBounds
+    addX = (high[:, 0] - low[:, 0]) / 10
+    addY = (high[:, 1] - low[:, 1]) / 10
+    bounds[nonEmpty] = np.column_stack((low[:, 0] - addX, low[:, 1] - addY, high[:, 0] + addX, high[:, 1] + addY))
+    return bounds
+
+
+def solveChunk(offsets: np.ndarray, coords: np.ndarray, bounds: np.ndarray):
+    """
+    solves sets of one chunk, offsets start at 0
+    :return: vertices, half edge tables and numbers of vertices and half edges of every set,
+             indices are numbered from 0 in the chunk
+    """
+    voronoi = BatchVoronoi()
+    diagram = voronoi.diagram
+    vertexCounts = []
+    edgeCounts = []
+    coords = coords.tolist()
+    bounds = bounds.tolist()
+
+    for i in range(len(offsets) - 1):
+        start, end = offsets[i], offsets[i + 1]
+        vertices = diagram.vertexCount()
+        edges = diagram.halfEdgeCount()
+        if start < end:
+            voronoi.load(coords[start:end], bounds[i])
+            voronoi.solve()
+        vertexCounts.append(diagram.vertexCount() - vertices)
+        edgeCounts.append(diagram.halfEdgeCount() - edges)
+
+    vertices = np.column_stack((np.frombuffer(diagram.vertexX), np.frombuffer(diagram.vertexY)))
+    edges = {name: np.frombuffer(getattr(diagram, name), dtype=np.int64) for name in TABLES}
+    return vertices, edges, vertexCounts, edgeCounts
+
+
+def solveBatch(offsets, coords, bounds: Optional[np.ndarray] = None, workers: Optional[int] = None,
+               chunkSites: int = CHUNK_SITES) -> DiagramBatch:
+    """
+    :param offsets: k + 1 increasing indices, sites of set i are coords[offsets[i]:offsets[i + 1]]
+                    (without duplicates in one set)
+    :param coords: (n, 2) coordinates of sites of all sets
+    :param bounds: (k, 4) boxes cutting infinite edges (lower left x, y and upper right x, y),
+                   computed from sites if None
+    :param workers: processes of the pool, number of cpus if None, with 1 everything is solved in this process
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(coords) or np.any(np.diff(offsets) < 0):
+        raise ValueError("offsets must increase from 0 to number of sites")
+    bounds = batchBounds(offsets, coords) if bounds is None else np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+    workers = workers or os.cpu_count()
+
+    # chunks end at first set reaching next multiple of chunkSites sites
+    k = len(offsets) - 1
+    cuts = np.searchsorted(offsets, np.arange(chunkSites, offsets[-1], chunkSites), side='left')
+    cuts = np.unique(np.concatenate(([0], cuts, [k])))
+    chunks = [(offsets[a:b + 1] - offsets[a], coords[offsets[a]:offsets[b]], bounds[a:b])
+              for a, b in zip(cuts[:-1], cuts[1:])]
+
+    if workers == 1 or len(chunks) <= 1:
+        results = [solveChunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(solveChunk, *zip(*chunks)))
+
+    # numbering of every chunk is shifted by elements of chunks before it
+    vertexCounts = []
+    edgeCounts = []
+    vertices = []
+    edges = {name: [] for name in TABLES}
+    vertexBase = 0
+    edgeBase = 0
+    for first, (chunkVertices, chunkEdges, chunkVertexCounts, chunkEdgeCounts) in zip(cuts[:-1], results):
+        siteBase = offsets[first]
+        vertices.append(chunkVertices)
+        for name, base in zip(TABLES, (siteBase, vertexBase, vertexBase, edgeBase, edgeBase, edgeBase)):
+            table = chunkEdges[name]
+            edges[name].append(np.where(table == -1, -1, table + base))
+        vertexCounts.extend(chunkVertexCounts)
+        edgeCounts.extend(chunkEdgeCounts)
+        vertexBase += len(chunkVertices)
+        edgeBase += len(chunkEdges['edgeSite'])
+
+    def concatenate(parts, dtype, shape):
+        return np.concatenate(parts) if parts else np.zeros(shape, dtype=dtype)
+
+    return DiagramBatch(offsets, np.concatenate(([0], np.cumsum(vertexCounts, dtype=np.int64))),
+                        np.concatenate(([0], np.cumsum(edgeCounts, dtype=np.int64))), coords,
+                        concatenate(vertices, np.float64, (0, 2)),
+                        {name: concatenate(parts, np.int64, 0) for name, parts in edges.items()}, bounds)
+
+
+if __name__ == '__main__':
+    from random import randint, uniform
+    from time import time
+
+    counts = [randint(10, 100) for _ in range(5000)]
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    coords = np.array([(uniform(0, 1000), uniform(0, 1000)) for _ in range(offsets[-1])])
+
+    start = time()
+    for i in range(len(counts)):
+        Voronoi(set(Point(x, y) for x, y in coords[offsets[i]:offsets[i + 1]].tolist())).solve()
+    print("one by one", time() - start)
+
+    start = time()
+    batch = solveBatch(offsets, coords)
+    print("batch", time() - start, len(batch), "diagrams", len(batch.vertexX), "vertices",
+          len(batch.edgeSite), "half edges")
@@ -0,0 +1,170 @@
+import numpy as np
+
+from dataTypes import Point
+from diagram import Diagram
+
+"""
+Clipping of finished diagram to the box. Every half edge lies on bisector of its site and site of its twin,
+with its site on the left, so it is an interval of parameter along that bisector (infinite, if the end is missing).
+All intervals are clipped to the box at once. Cell cut by the box is convex, so clipped half edges of a cell
+sorted by angle around a point inside it give its boundary in counter clockwise order, and gaps between them
+lie on the box boundary and are closed with box corners.
+"""
+
+EPSILON = 1e-9  # relative to size of box, ends closer than that are taken as the same point
+
+
+class CellPolygons:
+    """closed polygons of all cells, vertices of cell i are x[offsets[i]:offsets[i + 1]], y[...], counter clockwise"""
+
+    def __init__(self, offsets: np.ndarray, x: np.ndarray, y: np.ndarray):
+        self.offsets = offsets
+        self.x = x
+        self.y = y
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def polygon(self, i: int) -> list[tuple[float, float]]:
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return list(zip(self.x[start:end].tolist(), self.y[start:end].tolist()))
+
+
+def clipEdges(diagram: Diagram, lowerLeft: Point, upperRight: Point):
+    """
+    clips all half edges to the box
+    :return: site of every half edge and coordinates of its clipped start and end,
+             half edges lying outside the box are dropped
+    """
+    edgeSite = np.frombuffer(diagram.edgeSite, dtype=np.int64)
+    edgeTwin = np.frombuffer(diagram.edgeTwin, dtype=np.int64)
+    siteX = np.frombuffer(diagram.siteX, dtype=np.float64)
+    siteY = np.frombuffer(diagram.siteY, dtype=np.float64)
+    # missing vertex (-1) points at the padding
+    vertexX = np.append(np.frombuffer(diagram.vertexX, dtype=np.float64), np.nan)
+    vertexY = np.append(np.frombuffer(diagram.vertexY, dtype=np.float64), np.nan)
+
+    keep = edgeTwin >= 0
+    site = edgeSite[keep]
+    other = edgeSite[edgeTwin[keep]]
+
+    # bisector as midpoint + t * direction, site lies on the left of direction
+    midX = (siteX[site] + siteX[other]) / 2
+    midY = (siteY[site] + siteY[other]) / 2
+    dirX = siteY[site] - siteY[other]
+    dirY = siteX[other] - siteX[site]
+    length2 = dirX * dirX + dirY * dirY
+
+    def parameter(vertex, missing):
+        """parameter of vertices along bisectors, missing for half edges without that end"""
+        has = vertex >= 0
+        t = ((vertexX[vertex] - midX) * dirX + (vertexY[vertex] - midY) * dirY) / length2
+        return has, np.where(has, t, missing)
+
+    hasStart, start = parameter(np.frombuffer(diagram.edgeStart, dtype=np.int64)[keep], -np.inf)
+    hasEnd, end = parameter(np.frombuffer(diagram.edgeEnd, dtype=np.int64)[keep], np.inf)
+
+    # Liang-Barsky, one slab of the box per axis
+    t0 = start
+    t1 = end
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for mid, direction, low, high in ((midX, dirX, lowerLeft.x, upperRight.x),
+                                          (midY, dirY, lowerLeft.y, upperRight.y)):
+            a = (low - mid) / direction
+            b = (high - mid) / direction
+            parallel = direction == 0
+            t0 = np.where(parallel, t0, np.maximum(t0, np.minimum(a, b)))
+            t1 = np.where(parallel, t1, np.minimum(t1, np.maximum(a, b)))
+            t1 = np.where(parallel & ((mid < low) | (mid > high)), -np.inf, t1)
+
+    visible = t0 < t1
+    site = site[visible]
+
+    def pointAt(t, original, has, vertex):
+        """ends that were not clipped keep exact coordinates of their vertices"""
+        exact = has & (t == original)
+        vertex = np.frombuffer(vertex, dtype=np.int64)[keep]
+        x = np.where(exact, vertexX[vertex], midX + t * dirX)
+        y = np.where(exact, vertexY[vertex], midY + t * dirY)
+        return x[visible], y[visible]
+
+    x0, y0 = pointAt(t0, start, hasStart, diagram.edgeStart)
+    x1, y1 = pointAt(t1, end, hasEnd, diagram.edgeEnd)
+    return site, x0, y0, x1, y1
+
+
+def boxPosition(x: np.ndarray, y: np.ndarray, lowerLeft: Point, upperRight: Point) -> np.ndarray:
+    """position of points on the box boundary, as distance from lower left corner counter clockwise"""
+    width = upperRight.x - lowerLeft.x
+    height = upperRight.y - lowerLeft.y
+    distances = np.stack((y - lowerLeft.y, upperRight.x - x, upperRight.y - y, x - lowerLeft.x))
+    side = distances.argmin(axis=0)
+
+    positions = np.stack((x - lowerLeft.x, width + y - lowerLeft.y,
+                          width + height + upperRight.x - x, 2 * width + height + upperRight.y - y))
+    return np.take_along_axis(positions, side[None], axis=0)[0]
+
+
+def cellPolygons(diagram: Diagram, lowerLeft: Point, upperRight: Point) -> CellPolygons:
+    """closed polygons of all cells of diagram cut by the box"""
+    n = diagram.siteCount()
+    site, x0, y0, x1, y1 = clipEdges(diagram, lowerLeft, upperRight)
+
+    width = upperRight.x - lowerLeft.x
+    height = upperRight.y - lowerLeft.y
+    perimeter = 2 * (width + height)
+    tolerance = EPSILON * max(width, height)
+    cornerX = np.array([lowerLeft.x, upperRight.x, upperRight.x, lowerLeft.x])
+    cornerY = np.array([lowerLeft.y, lowerLeft.y, upperRight.y, upperRight.y])
+    cornerPosition = np.array([0, width, width + height, 2 * width + height])
+
+    # half edges of every cell by angle around mean of their midpoints, which lies inside the cell
+    midX = (x0 + x1) / 2
+    midY = (y0 + y1) / 2
+    count = np.bincount(site, minlength=n)
+    safeCount = np.maximum(count, 1)
+    centerX = np.bincount(site, weights=midX, minlength=n) / safeCount
+    centerY = np.bincount(site, weights=midY, minlength=n) / safeCount
+    order = np.lexsort((np.arctan2(midY - centerY[site], midX - centerX[site]), site))
+    site, x0, y0, x1, y1 = site[order], x0[order], y0[order], x1[order], y1[order]
+
+    # next half edge on boundary of the same cell, last one is followed by the first
+    first = np.concatenate(([0], np.cumsum(count)))[:-1]
+    index = np.arange(len(site))
+    following = np.where(index + 1 < first[site] + count[site], index + 1, first[site])
+
+    # gap from end of half edge to start of the next one goes counter clockwise along box boundary
+    gap = np.hypot(x1 - x0[following], y1 - y0[following]) > tolerance
+    fromPosition = boxPosition(x1, y1, lowerLeft, upperRight)
+    length = (boxPosition(x0[following], y0[following], lowerLeft, upperRight) - fromPosition) % perimeter
+    relative = (cornerPosition[None, :] - fromPosition[:, None]) % perimeter
+    inside = gap[:, None] & (relative > tolerance) & (relative < length[:, None] - tolerance)
+    corners = np.argsort(np.where(inside, relative, np.inf), axis=1)
+    cornerCount = inside.sum(axis=1)
+
+    # every half edge gives its start, and if gap follows it - its end and corners in the gap,
+    # cells without any half edge inside the box (only site in it) are the whole box
+    size = 1 + gap * (1 + cornerCount)
+    perSite = np.bincount(site, weights=size, minlength=n).astype(np.int64)
+    perSite[count == 0] = 4
+    offsets = np.concatenate(([0], np.cumsum(perSite)))
+
+    before = np.concatenate(([0], np.cumsum(size)))[:-1]
+    position = offsets[site] + before - before[first[site]]
+    x = np.empty(offsets[-1])
+    y = np.empty(offsets[-1])
+    x[position] = x0
+    y[position] = y0
+    x[position[gap] + 1] = x1[gap]
+    y[position[gap] + 1] = y1[gap]
+    for k in range(4):
+        withCorner = cornerCount > k
+        x[position[withCorner] + 2 + k] = cornerX[corners[withCorner, k]]
+        y[position[withCorner] + 2 + k] = cornerY[corners[withCorner, k]]
+
+    empty = offsets[:-1][count == 0]
+    for k in range(4):
+        x[empty + k] = cornerX[k]
+        y[empty + k] = cornerY[k]
+
+    return CellPolygons(offsets, x, y)
@@ -1,10 +1,15 @@
-from math import sqrt
+from math import sqrt, hypot
 from typing import Optional
 
 from dataTypes import Point
+from geometry.kernels import orient2d, circumcenter
 
 def getIntersectionOfParabolas(p1: Point, p2: Point, y: float) -> Point:
     """compute intersection of parabolas from p1 and p2 at x coordinate"""
+    return Point(getIntersectionX(p1, p2, y), y)
+
+def getIntersectionX(p1: Point, p2: Point, y: float) -> float:
+    """x coordinate of intersection of parabolas from p1 and p2 for sweep line at y"""
     if p1.y == p2.y:
         px = (p1.x + p2.x) / 2
     elif p1.y == y:
@@ -21,29 +26,19 @@ def getIntersectionOfParabolas(p1: Point, p2: Point, y: float) -> Point:
 
         px = (-b + sqrt(b ** 2 - 4 * a * c)) / (2 * a)
 
-    return Point(px, y)
-
-def det(a,b,c):
-    return a.x*b.y+a.y*c.x+b.x*c.y-c.x*b.y-a.y*b.x-a.x*c.y
-
-"""
-https://math.stackexchange.com/questions/213658/get-the-equation-of-a-circle-when-given-3-points
+    return px
 
-"""
+def det(a: Point, b: Point, c: Point) -> float:
+    """positive if a, b, c go counter clockwise, negative if clockwise, zero if collinear (sign is exact)"""
+    return orient2d(a.x, a.y, b.x, b.y, c.x, c.y)
 
 def getConvergencePoint(point1: Point, point2: Point, point3: Point) -> tuple[Optional[Point], Optional[float]]:
-    # print("points",point1, point2, point3)
-
-    p1 = complex(point1.x, point1.y)
-    p2 = complex(point2.x, point2.y)
-    p3 = complex(point3.x, point3.y)
-
-    w = (p3 - p1) / (p2 - p1)
-    if w.imag == 0:
+    """center of circle through points and y of its lowest point, None, None if points are collinear"""
+    try:
+        x, y = circumcenter(point1.x, point1.y, point2.x, point2.y, point3.x, point3.y)
+    except ZeroDivisionError:
         return None, None
-    c = (p2 - p1) * (w - abs(w) ** 2) / (2j * w.imag) + p1  # type: complex
-    r = abs(p1 - c)  # type: float
 
-    center = Point(c.real, c.imag)
+    center = Point(x, y)
 
-    return center, center.y - r
+    return center, y - hypot(point1.x - x, point1.y - y)
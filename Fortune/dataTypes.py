@@ -2,6 +2,7 @@ from typing import Optional
 
 
 class Point:
+    __slots__ = ('x', 'y', 'arc', 'edge', 'orderingY', 'index')
     precision = 4
 
     def __init__(self, x: float, y: float):
@@ -13,17 +14,15 @@ class Point:
         self.arc = None  # type: Optional[RBNode]
         self.edge = None  # type: Optional[HalfEdge]
         self.orderingY = self.y
+        self.index = -1  # index in Diagram site or vertex table, -1 if not stored
 
     def setOrdering(self, y):
         self.orderingY = y
         # self.orderingY = round(y, Point.precision)
 
-    def toPQ(self) -> tuple[float, 'Point']:
-        """returns tuple containing ordering y and point itself, useful if storing in priority queue"""
-        return -self.orderingY, self
-
     def __hash__(self):
-        return hash(self.x) * hash(self.y)
+        # tuple hash mixes coordinates, (a, b) and (b, a) or points with zero coordinate do not collide
+        return hash((self.x, self.y))
 
     def __repr__(self):
         return "(" + str(self.x) + ", " + str(self.y) + ")"
@@ -35,27 +34,37 @@ class Point:
         return self.x == other.x and self.y == other.y
 
 class HalfEdge:
-    def __init__(self):
+    __slots__ = ('start', 'end', 'next', 'prev', 'twin', 'site', 'index')
+
+    def __init__(self, site: Optional[Point] = None, index: int = -1):
         self.start = None  # type: Optional[Point]
         self.end = None  # type: Optional[Point]
 
         self.next = None  # type: Optional[HalfEdge]
         self.prev = None  # type: Optional[HalfEdge]
+        self.twin = None  # type: Optional[HalfEdge]
+
+        self.site = site  # type: Optional[Point]  # site whose cell is bounded by this half edge
+        self.index = index  # index in Diagram half edge table, -1 if not stored
 
     def __repr__(self):
         return "[" + str(self.start) + " -> " + str(self.end) + "]"
 
     def __hash__(self):
-        return hash(self.start) * hash(self.end)
+        # equality does not depend on direction, so neither does hash
+        return hash(frozenset((self.start, self.end)))
 
     def __eq__(self, other):
         if other is None:
             return False
         return (self.start == other.start and self.end == other.end) or \
-               (self.start == other.end and self.end == other.end)
+               (self.start == other.end and self.end == other.start)
 
 
 class RBNode:
+    __slots__ = ('parent', 'left', 'right', 'color', 'point', 'leftHalfEdge', 'rightHalfEdge', 'prev', 'next',
+                 'triggeredBy', 'breakpointX', 'breakpointY', 'breakpointSite')
+
     def __init__(self, point: Point, color=1, parent=None, left=None, right=None, leftHalfEdge=None,
                  rightHalfEdge=None):
         self.parent = parent  # type: Optional[RBNode]
@@ -68,4 +77,10 @@ class RBNode:
         self.rightHalfEdge = HalfEdge() if rightHalfEdge is None else rightHalfEdge  # type: Optional[HalfEdge]
         self.prev = None  # type: Optional[RBNode]
         self.next = None  # type: Optional[RBNode]
-        self.triggeredBy = None  # type: Optional[Point]
+        self.triggeredBy = None  # type: Optional[list]  # handle of circle event in EventQueue
+
+        # cached x of breakpoint between this arc and arc of breakpointSite, valid only for sweep at breakpointY
+        # (site, not the next arc itself, so cache does not keep removed arcs alive)
+        self.breakpointX = None  # type: Optional[float]
+        self.breakpointY = None  # type: Optional[float]
+        self.breakpointSite = None  # type: Optional[Point]
@@ -0,0 +1,63 @@
+from array import array
+
+"""
+Compact storage of computed diagram - sites, vertices and half edges are kept in flat typed arrays
+and addressed by integer index, -1 means missing element (e.g. end of infinite half edge).
+"""
+
+
+class Diagram:
+    def __init__(self):
+        self.siteX = array('d')
+        self.siteY = array('d')
+
+        self.vertexX = array('d')
+        self.vertexY = array('d')
+
+        self.edgeSite = array('q')  # site whose cell is bounded by half edge
+        self.edgeStart = array('q')  # vertex indices
+        self.edgeEnd = array('q')
+        self.edgeTwin = array('q')  # half edge indices
+        self.edgeNext = array('q')
+        self.edgePrev = array('q')
+
+    def addSite(self, x: float, y: float) -> int:
+        self.siteX.append(x)
+        self.siteY.append(y)
+        return len(self.siteX) - 1
+
+    def addVertex(self, x: float, y: float) -> int:
+        self.vertexX.append(x)
+        self.vertexY.append(y)
+        return len(self.vertexX) - 1
+
+    def addHalfEdge(self, site: int) -> int:
+        self.edgeSite.append(site)
+        for table in (self.edgeStart, self.edgeEnd, self.edgeTwin, self.edgeNext, self.edgePrev):
+            table.append(-1)
+        return len(self.edgeSite) - 1
+
+    def clear(self) -> None:
+        """removes all elements, tables stay the same objects"""
+        for table in (self.siteX, self.siteY, self.vertexX, self.vertexY, self.edgeSite, self.edgeStart,
+                      self.edgeEnd, self.edgeTwin, self.edgeNext, self.edgePrev):
+            del table[:]
+
+    def siteCount(self) -> int:
+        return len(self.siteX)
+
+    def vertexCount(self) -> int:
+        return len(self.vertexX)
+
+    def halfEdgeCount(self) -> int:
+        return len(self.edgeSite)
+
+    def getSite(self, i: int) -> tuple[float, float]:
+        return self.siteX[i], self.siteY[i]
+
+    def getVertex(self, i: int) -> tuple[float, float]:
+        return self.vertexX[i], self.vertexY[i]
+
+    def getHalfEdge(self, i: int) -> tuple[int, int]:
+        """returns start and end vertex index of half edge"""
+        return self.edgeStart[i], self.edgeEnd[i]
@@ -0,0 +1,94 @@
+import struct
+import sys
+from array import array
+
+import numpy as np
+
+from diagram import Diagram
+
+"""
+Binary file with Diagram tables, mapped to memory on load (without copying), so many processes can share
+one diagram through page cache.
+
+Layout (little endian):
+    header, 64 bytes: magic b'VORONOI\\0', version (uint32), flags (uint32, 0),
+                      number of sites, vertices and half edges (uint64), zero padding
+    tables, one after another: siteX, siteY, vertexX, vertexY (float64),
+                               edgeSite, edgeStart, edgeEnd, edgeTwin, edgeNext, edgePrev (int64, -1 if missing)
+"""
+
+MAGIC = b'VORONOI\0'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQQ')
+HEADER_SIZE = 64
+
+SITE_TABLES = ('siteX', 'siteY')
+VERTEX_TABLES = ('vertexX', 'vertexY')
+EDGE_TABLES = ('edgeSite', 'edgeStart', 'edgeEnd', 'edgeTwin', 'edgeNext', 'edgePrev')
+
+
+def saveDiagram(diagram: Diagram, path: str) -> None:
+    with open(path, 'wb') as file:
+        header = HEADER.pack(MAGIC, VERSION, 0, diagram.siteCount(), diagram.vertexCount(), diagram.halfEdgeCount())
+        file.write(header.ljust(HEADER_SIZE, b'\0'))
+
+        for name in SITE_TABLES + VERTEX_TABLES + EDGE_TABLES:
+            table = getattr(diagram, name)
+            if sys.byteorder == 'big':
+                table = array(table.typecode, table)
+                table.byteswap()
+            file.write(memoryview(table).cast('B'))
+
+
+class MappedDiagram(Diagram):
+    """Diagram loaded from file, tables are read only numpy arrays mapped to the file"""
+
+    def __init__(self, path: str):
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(data) < HEADER_SIZE:
+            raise ValueError(path + " is not a diagram file")
+        magic, version, _, sites, vertices, halfEdges = HEADER.unpack_from(data[:HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError(path + " is not a diagram file")
+        if version != VERSION:
+            raise ValueError("unsupported diagram file version " + str(version))
+
+        # all tables have 8 byte elements
+        size = HEADER_SIZE + 8 * (len(SITE_TABLES) * sites + len(VERTEX_TABLES) * vertices +
+                                  len(EDGE_TABLES) * halfEdges)
+        if size != len(data):
+            raise ValueError(path + " has wrong size for its header")
+
+        offset = HEADER_SIZE
+        for names, count, dtype in ((SITE_TABLES, sites, '<f8'), (VERTEX_TABLES, vertices, '<f8'),
+                                    (EDGE_TABLES, halfEdges, '<i8')):
+            for name in names:
+                table = np.ndarray(count, dtype=dtype, buffer=data, offset=offset)
+                setattr(self, name, table)
+                offset += table.nbytes
+
+
+def loadDiagram(path: str) -> MappedDiagram:
+    return MappedDiagram(path)
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    from random import uniform
+    from time import time
+
+    from dataTypes import Point
+    from voronoiFortunemethod import Voronoi
+
+    voronoi = Voronoi(set(Point(uniform(0, 1000), uniform(0, 1000)) for _ in range(100000)))
+    voronoi.solve()
+
+    path = os.path.join(tempfile.mkdtemp(), 'diagram.bin')
+    start = time()
+    saveDiagram(voronoi.diagram, path)
+    print("saved", os.path.getsize(path), "bytes", time() - start)
+
+    start = time()
+    loaded = loadDiagram(path)
+    print("loaded", loaded.siteCount(), "sites", loaded.halfEdgeCount(), "half edges", time() - start)
@@ -0,0 +1,84 @@
+from heapq import heappush, heappop, heapify
+from itertools import count
+from typing import Optional
+
+from dataTypes import Point
+
+"""
+Event queue for the sweep, built on heapq instead of queue.PriorityQueue (no locking, sweep is single-threaded).
+Every put returns a handle (the heap entry itself), which can be used to cancel the event later.
+Cancelled entries are tombstoned and dropped when they reach the top of the heap, or all at once
+when tombstones make up more than half of the heap.
+"""
+
+REMOVED = None  # placeholder for cancelled event in heap entry
+
+# kind of event, stored next to it, so sweep does not have to look events up in set of sites
+SITE = 0
+CIRCLE = 1
+
+
+class EventQueue:
+    def __init__(self):
+        self.heap = []  # type: list[list]
+        self.counter = count()  # tie-breaker, events with equal y are popped in insertion order
+        self.removedCount = 0
+
+    def put(self, event: Point, y: float, kind: int = CIRCLE) -> list:
+        """adds event with ordering y (greater y goes first), returns handle that can be passed to cancel"""
+        entry = [-y, next(self.counter), event, kind]
+        heappush(self.heap, entry)
+        return entry
+
+    def putAll(self, events, kind: int = SITE) -> None:
+        """
+        adds many events at once, events are ordered by their orderingY, events with equal orderingY by x
+        (sweep needs sites with equal y from left to right)
+        """
+        for event in sorted(events, key=lambda e: (-e.orderingY, e.x)):
+            self.heap.append([-event.orderingY, next(self.counter), event, kind])
+        heapify(self.heap)
+
+    def cancel(self, handle: Optional[list]) -> None:
+        """marks event as removed, does nothing if it was already popped or cancelled"""
+        if handle is None or handle[2] is REMOVED:
+            return
+        handle[2] = REMOVED
+        self.removedCount += 1
+
+        if self.removedCount > len(self.heap) // 2:
+            self.compact()
+
+    def compact(self) -> None:
+        """drops all cancelled entries from heap"""
+        self.heap = [entry for entry in self.heap if entry[2] is not REMOVED]
+        heapify(self.heap)
+        self.removedCount = 0
+
+    def clear(self) -> None:
+        self.heap.clear()
+        self.removedCount = 0
+
+    def get(self) -> tuple[int, Point]:
+        """removes event with greatest y, returns its kind and event itself, queue must not be empty"""
+        while True:
+            entry = heappop(self.heap)
+            event = entry[2]
+            if event is REMOVED:
+                self.removedCount -= 1
+                continue
+            entry[2] = REMOVED  # popped handle is no longer cancellable
+            return entry[3], event
+
+    def peekY(self) -> float:
+        """ordering y of event that get would return, queue must not be empty"""
+        while self.heap[0][2] is REMOVED:
+            heappop(self.heap)
+            self.removedCount -= 1
+        return -self.heap[0][0]
+
+    def empty(self) -> bool:
+        return len(self.heap) == self.removedCount
+
+    def __len__(self):
+        return len(self.heap) - self.removedCount
@@ -0,0 +1,141 @@
+from collections import defaultdict
+from time import perf_counter
+from typing import Callable, Optional
+
+"""
+Opt-in counters and timers of the sweep. Instrumented methods are wrapped on Voronoi object (and its beach line
+and event queue) only when stats are given, so sweep without stats runs exactly the same code as before.
+
+Reported values:
+    siteEvents, circleEvents - events handled
+    invalidatedEvents - circle events cancelled before they were reached
+    rotations - rotations of beach line tree (done while fixing it after insert and delete)
+    maxBeachLine - the largest number of arcs on beach line
+    getNodeAboveCalls, getNodeAboveTime - searches of arc above new site, and seconds spent in them
+    solveTime - seconds of whole solve
+"""
+
+
+class SweepStats:
+    def __init__(self, callback: Optional[Callable[[dict], None]] = None):
+        """
+        :param callback: called with report after every solve
+        """
+        self.counters = defaultdict(int)  # type: dict[str, int]
+        self.timers = defaultdict(float)  # type: dict[str, float]
+        self.maxima = defaultdict(int)  # type: dict[str, int]
+        self.callback = callback
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def addTime(self, name: str, seconds: float) -> None:
+        self.timers[name] += seconds
+
+    def observe(self, name: str, value: int) -> None:
+        if value > self.maxima[name]:
+            self.maxima[name] = value
+
+    def report(self) -> dict:
+        return {**self.counters, **self.timers, **self.maxima}
+
+    def finish(self) -> None:
+        if self.callback is not None:
+            self.callback(self.report())
+
+
+def instrument(voronoi, stats: SweepStats) -> None:
+    """wraps methods of voronoi (not yet solved) to report to stats"""
+    arcs = [0]  # number of arcs on beach line, kept by instrumented tree
+
+    handleSiteEvent = voronoi.handleSiteEvent
+    handleCircleEvent = voronoi.handleCircleEvent
+    solve = voronoi.solve
+    cancel = voronoi.events.cancel
+
+    def instrumentedSiteEvent(point):
+        stats.count('siteEvents')
+        handleSiteEvent(point)
+
+    def instrumentedCircleEvent(point):
+        stats.count('circleEvents')
+        handleCircleEvent(point)
+
+    def instrumentedCancel(handle):
+        if handle is not None and handle[2] is not None:
+            stats.count('invalidatedEvents')
+        cancel(handle)
+
+    def instrumentedSolve():
+        instrumentTree(voronoi.beachLine, stats, arcs)
+        arcs[0] = 0
+        start = perf_counter()
+        solve()
+        stats.addTime('solveTime', perf_counter() - start)
+        stats.finish()
+
+    voronoi.handleSiteEvent = instrumentedSiteEvent
+    voronoi.handleCircleEvent = instrumentedCircleEvent
+    voronoi.events.cancel = instrumentedCancel
+    voronoi.solve = instrumentedSolve
+
+
+def instrumentTree(tree, stats: SweepStats, arcs: list[int]) -> None:
+    """
+    wraps rotations, search, inserts and deletes of beach line tree, once per tree
+    :param arcs: one element list, number of arcs is counted in it by inserts and deletes (a site event adds one
+    arc to the tree or two, depending on whether it splits an arc, so it is not known before the handler runs)
+    """
+    if 'getNodeAbove' in vars(tree):
+        return
+
+    leftRotate = tree.left_rotate
+    rightRotate = tree.right_rotate
+    getNodeAbove = tree.getNodeAbove
+    createRoot = tree.createRoot
+    insertBefore = tree.insertBefore
+    insertAfter = tree.insertAfter
+    delete = tree.delete
+
+    def added():
+        arcs[0] += 1
+        stats.observe('maxBeachLine', arcs[0])
+
+    def instrumentedCreateRoot(node):
+        createRoot(node)
+        added()
+
+    def instrumentedInsertBefore(beforeNode, toInsert):
+        insertBefore(beforeNode, toInsert)
+        added()
+
+    def instrumentedInsertAfter(afterNode, toInsert):
+        insertAfter(afterNode, toInsert)
+        added()
+
+    def instrumentedDelete(node):
+        delete(node)
+        arcs[0] -= 1
+
+    def instrumentedLeftRotate(node):
+        stats.count('rotations')
+        leftRotate(node)
+
+    def instrumentedRightRotate(node):
+        stats.count('rotations')
+        rightRotate(node)
+
+    def instrumentedGetNodeAbove(point):
+        stats.count('getNodeAboveCalls')
+        start = perf_counter()
+        node = getNodeAbove(point)
+        stats.addTime('getNodeAboveTime', perf_counter() - start)
+        return node
+
+    tree.left_rotate = instrumentedLeftRotate
+    tree.right_rotate = instrumentedRightRotate
+    tree.getNodeAbove = instrumentedGetNodeAbove
+    tree.createRoot = instrumentedCreateRoot
+    tree.insertBefore = instrumentedInsertBefore
+    tree.insertAfter = instrumentedInsertAfter
+    tree.delete = instrumentedDelete
@@ -0,0 +1,87 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+from analytics import cellCentroids
+from dataTypes import Point
+from voronoiFortunemethod import Voronoi
+
+"""
+Lloyd relaxation (centroidal Voronoi tessellation) - every iteration moves each site to centroid of its cell
+cut by the box. One Voronoi object is used for all iterations: sites are the same Point objects moved in place,
+box and order of sites computed for the first diagram are kept (sites move only a little, and centroids
+never leave the box), event queue and diagram tables are cleared instead of allocated again. Only the set
+of points is built again after every move, as its hashes depend on coordinates.
+"""
+
+
+class LloydRelaxation:
+    def __init__(self, points: Iterable[tuple[float, float]], order: Optional[str] = 'hilbert',
+                 bounds: Optional[tuple[Point, Point]] = None):
+        """
+        :param order: order of sites, see ordering module
+        :param bounds: box that cuts cells, computed from points if None
+        """
+        self.voronoi = Voronoi(set(Point(x, y) for x, y in points), order, bounds)
+        self.iterations = 0
+
+    def step(self) -> float:
+        """one iteration, returns the longest move of a site"""
+        voronoi = self.voronoi
+        if self.iterations > 0:
+            voronoi.reset()
+        voronoi.solve()
+
+        centroids = cellCentroids(voronoi.getCellPolygons())
+        sites = voronoi.sites
+        old = np.column_stack((np.frombuffer(voronoi.diagram.siteX, dtype=np.float64),
+                               np.frombuffer(voronoi.diagram.siteY, dtype=np.float64)))
+        for p, (x, y) in zip(sites, centroids.tolist()):
+            p.x = x
+            p.y = y
+        # hash of Point is computed from its place, so set of moved points is built again
+        voronoi.points = set(sites)
+
+        self.iterations += 1
+        return float(np.sqrt(((centroids - old) ** 2).sum(axis=1)).max(initial=0))
+
+    def run(self, iterations: int, tolerance: float = 0.0) -> int:
+        """
+        iterates until no site moves further than tolerance, or for given number of iterations
+        :return: number of iterations done
+        """
+        for i in range(iterations):
+            if self.step() <= tolerance:
+                return i + 1
+        return iterations
+
+    def coordinates(self) -> list[tuple[float, float]]:
+        """current sites, in order of sites of diagram"""
+        return [(p.x, p.y) for p in self.voronoi.sites]
+
+
+if __name__ == '__main__':
+    from random import uniform
+    from time import time
+
+    from analytics import cellAreas
+
+    test = [(uniform(0, 1000), uniform(0, 1000)) for _ in range(10000)]
+
+    start = time()
+    lloyd = LloydRelaxation(test)
+    done = lloyd.run(20, tolerance=0.01)
+    print("iterations", done, time() - start)
+
+    # rebuilding everything in every iteration, for comparison
+    start = time()
+    points = test
+    for _ in range(done):
+        voronoi = Voronoi(set(Point(x, y) for x, y in points), 'hilbert',
+                          (lloyd.voronoi.lowerLeft, lloyd.voronoi.upperRight))
+        voronoi.solve()
+        points = cellCentroids(voronoi.getCellPolygons()).tolist()
+    print("rebuilt", time() - start)
+
+    areas = cellAreas(lloyd.voronoi.getCellPolygons())
+    print("area of cells in last diagram: min", areas.min(), "max", areas.max())
@@ -0,0 +1,107 @@
+import numpy as np
+
+from analytics import neighbourGraph
+from diagram import Diagram
+
+"""
+Answers "which site owns this point" on finished diagram. Sites whose cells share an edge (twin half edges)
+are neighbours in Delaunay triangulation, and greedy walk on it - moving to the neighbour closer to query
+as long as there is one - stops in the nearest site. Walk starts from site stored for bucket of a coarse grid,
+so for not too clustered sites it takes only a few steps. It is not an O(log n) lookup - the number of steps
+grows with the number of sites between seed and query, so on clustered sites (grid buckets much larger
+than clusters) a query takes O(cluster size) steps.
+"""
+
+
+class SiteLocator:
+    def __init__(self, diagram: Diagram):
+        """diagram must be filled by Voronoi.solve and contain at least one site"""
+        self.siteX = np.frombuffer(diagram.siteX, dtype=np.float64).copy()
+        self.siteY = np.frombuffer(diagram.siteY, dtype=np.float64).copy()
+        self.siteXList = self.siteX.tolist()
+        self.siteYList = self.siteY.tolist()
+        n = len(self.siteX)
+
+        # neighbours of site i are adjacent[offsets[i]:offsets[i + 1]]
+        self.offsets, self.adjacent = neighbourGraph(diagram)
+        self.neighbours = [self.adjacent[self.offsets[i]:self.offsets[i + 1]].tolist() for i in range(n)]
+
+        # neighbours padded with -1 to the same length, for batched walk
+        counts = np.diff(self.offsets)
+        owner = np.repeat(np.arange(n), counts)
+        self.padded = np.full((n, max(int(counts.max(initial=0)), 1)), -1, dtype=np.int64)
+        self.padded[owner, np.arange(len(owner)) - self.offsets[owner]] = self.adjacent
+
+        self.buildGrid()
+
+    def buildGrid(self):
+        self.gridSize = max(1, int(np.sqrt(len(self.siteX) / 2)))
+        self.minX = self.siteX.min()
+        self.minY = self.siteY.min()
+        self.cellWidth = ((self.siteX.max() - self.minX) or 1.0) / self.gridSize
+        self.cellHeight = ((self.siteY.max() - self.minY) or 1.0) / self.gridSize
+
+        # start site for every bucket - nearest site to its center, found by walk from site 0
+        size = self.gridSize
+        centersX = self.minX + (np.arange(size * size) % size + 0.5) * self.cellWidth
+        centersY = self.minY + (np.arange(size * size) // size + 0.5) * self.cellHeight
+        self.seeds = self.walkMany(np.zeros(size * size, dtype=np.int64), centersX, centersY)
+        self.seedList = self.seeds.tolist()
+
+    def bucket(self, x, y):
+        size = self.gridSize
+        col = np.clip(((x - self.minX) / self.cellWidth).astype(np.int64), 0, size - 1)
+        row = np.clip(((y - self.minY) / self.cellHeight).astype(np.int64), 0, size - 1)
+        return row * size + col
+
+    def walkMany(self, start: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """greedy walks from sites start towards points (x, y), all at once"""
+        current = start.copy()
+        dist = (self.siteX[current] - x) ** 2 + (self.siteY[current] - y) ** 2
+        active = np.arange(len(current))
+
+        while len(active):
+            candidates = self.padded[current[active]]
+            candDist = (self.siteX[candidates] - x[active, None]) ** 2 + (self.siteY[candidates] - y[active, None]) ** 2
+            candDist[candidates < 0] = np.inf
+            best = candDist.argmin(axis=1)
+            bestDist = candDist[np.arange(len(active)), best]
+
+            moved = bestDist < dist[active]
+            active = active[moved]
+            current[active] = candidates[moved, best[moved]]
+            dist[active] = bestDist[moved]
+
+        return current
+
+    def query(self, x: float, y: float) -> int:
+        """index (in Diagram site table) of site nearest to (x, y)"""
+        size = self.gridSize
+        col = min(max(int((x - self.minX) / self.cellWidth), 0), size - 1)
+        row = min(max(int((y - self.minY) / self.cellHeight), 0), size - 1)
+
+        siteX = self.siteXList
+        siteY = self.siteYList
+        current = self.seedList[row * size + col]
+        dist = (siteX[current] - x) ** 2 + (siteY[current] - y) ** 2
+
+        while True:
+            best = current
+            for s in self.neighbours[current]:
+                d = (siteX[s] - x) ** 2 + (siteY[s] - y) ** 2
+                if d < dist:
+                    best = s
+                    dist = d
+            if best == current:
+                return current
+            current = best
+
+    def queryMany(self, points) -> np.ndarray:
+        """
+        :param points: (k, 2) array of query points
+        :return: array of indices of nearest sites
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        x = points[:, 0]
+        y = points[:, 1]
+        return self.walkMany(self.seeds[self.bucket(x, y)], x, y)
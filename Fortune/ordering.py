@@ -0,0 +1,68 @@
+from typing import Iterable, Optional
+
+from dataTypes import Point
+
+"""
+Order in which sites are stored. Sweep always visits sites by y, so ordering changes only layout of sites
+in memory (Diagram tables, heap, allocation of per site objects) - along Hilbert curve sites lying close
+on the plane, which are neighbours on beach line, are stored close to each other.
+"""
+
+ORDERS = (None, 'hilbert')
+
+
+def hilbertIndex(x: int, y: int, n: int) -> int:
+    """index of cell (x, y) on Hilbert curve filling n x n grid, n is power of 2"""
+    d = 0
+    s = n >> 1
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+
+        # rotating quadrant, so curve inside it starts and ends in right corners
+        if ry == 0:
+            if rx == 1:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+
+    return d
+
+
+def hilbertOrder(points: Iterable[Point], lowerLeft: Point, upperRight: Point, order=16) -> list[Point]:
+    n = 1 << order
+    size = max(upperRight.x - lowerLeft.x, upperRight.y - lowerLeft.y, 1e-300)
+    scale = (n - 1) / size
+
+    def key(p: Point) -> int:
+        return hilbertIndex(int((p.x - lowerLeft.x) * scale), int((p.y - lowerLeft.y) * scale), n)
+
+    return sorted(points, key=key)
+
+
+def siteOrder(points: Iterable[Point], lowerLeft: Point, upperRight: Point, order: Optional[str] = None) -> list[Point]:
+    """
+    :param order: None (order of iteration over points) or 'hilbert'
+    """
+    if order is None:
+        return list(points)
+    if order == 'hilbert':
+        return hilbertOrder(points, lowerLeft, upperRight)
+    raise ValueError("unknown site order: " + str(order))
+
+
+if __name__ == '__main__':
+    from random import uniform
+    from time import time
+
+    from voronoiFortunemethod import Voronoi
+
+    test = [(uniform(0, 1000), uniform(0, 1000)) for _ in range(20000)]
+
+    for order in ORDERS:
+        points = set(Point(x, y) for x, y in test)
+        start = time()
+        Voronoi(points, order).solve()
+        print(order, time() - start)
@@ -0,0 +1,251 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import floor, sqrt
+from typing import Optional
+
+from dataTypes import Point
+from diagram import Diagram
+from voronoiFortunemethod import Voronoi, getBounds
+
+"""
+Divide and conquer construction. Sites are divided into vertical strips with equal number of sites,
+every strip is solved in separate process together with sites lying in margin around it, and cells of
+sites owned by strip are stitched into one Diagram.
+
+Cell computed from part of sites is the same as in the whole diagram if circle around every its vertex
+(going through the site) is empty - contains none of all sites - and its infinite edges join neighbours
+on convex hull. The second holds always, because every tile gets also all sites of the convex hull.
+Sites whose cells do not pass the check are solved again with sites found inside their circles
+(until their cells pass it), so result does not depend on division into tiles.
+"""
+
+EPSILON = 1e-9  # sites closer to circle than that (relatively) are taken as lying on it
+MISSING_LIMIT = 8  # sites inside one circle added to tile of rejected site
+
+
+class SiteGrid:
+    """all sites in buckets of a uniform grid, for finding sites inside circles"""
+
+    def __init__(self, coords: list[tuple[float, float]]):
+        self.coords = coords
+        self.minX = min(x for x, _ in coords)
+        self.minY = min(y for _, y in coords)
+        self.maxX = max(x for x, _ in coords)
+        self.maxY = max(y for _, y in coords)
+        self.size = max(1, int(sqrt(len(coords) / 2)))
+        self.cellWidth = ((self.maxX - self.minX) or 1.0) / self.size
+        self.cellHeight = ((self.maxY - self.minY) or 1.0) / self.size
+
+        self.buckets = [[] for _ in range(self.size * self.size)]  # type: list[list[int]]
+        for i, (x, y) in enumerate(coords):
+            self.buckets[self.row(y) * self.size + self.column(x)].append(i)
+
+    def column(self, x: float) -> int:
+        return min(max(floor((x - self.minX) / self.cellWidth), 0), self.size - 1)
+
+    def row(self, y: float) -> int:
+        return min(max(floor((y - self.minY) / self.cellHeight), 0), self.size - 1)
+
+    def insideCircle(self, cx: float, cy: float, r: float) -> list[int]:
+        """sites lying strictly inside circle"""
+        limit = r * r * (1 - EPSILON)
+        result = []
+        # only part of circle inside bounding box of sites, circles of cells near convex hull are huge
+        if cx + r < self.minX or cx - r > self.maxX or cy + r < self.minY or cy - r > self.maxY:
+            return result
+
+        for row in range(self.row(cy - r), self.row(cy + r) + 1):
+            bottom = self.minY + row * self.cellHeight
+            dy = max(bottom - cy, cy - bottom - self.cellHeight, 0)
+            for column in range(self.column(cx - r), self.column(cx + r) + 1):
+                left = self.minX + column * self.cellWidth
+                dx = max(left - cx, cx - left - self.cellWidth, 0)
+                if dx * dx + dy * dy >= limit:
+                    continue
+                for i in self.buckets[row * self.size + column]:
+                    x, y = self.coords[i]
+                    if (x - cx) ** 2 + (y - cy) ** 2 < limit:
+                        result.append(i)
+        return result
+
+
+grid = None  # type: Optional[SiteGrid]  # all sites, separate in every worker process
+
+
+def initWorker(coords: list[tuple[float, float]]):
+    global grid
+    grid = SiteGrid(coords)
+
+
+def convexHull(coords: list[tuple[float, float]]) -> list[int]:
+    """indices of points on convex hull (collinear points on hull included)"""
+    order = sorted(range(len(coords)), key=lambda i: coords[i])
+
+    def cross(o, a, b):
+        (ox, oy), (ax, ay), (bx, by) = coords[o], coords[a], coords[b]
+        return (ax - ox) * (by - oy) - (ay - oy) * (bx - ox)
+
+    def chain(indices):
+        result = []
+        for i in indices:
+            while len(result) >= 2 and cross(result[-2], result[-1], i) < 0:
+                result.pop()
+            result.append(i)
+        return result
+
+    return list(set(chain(order) + chain(reversed(order))))
+
+
+def buildTile(ids: list[int], owned: list[int], bounds: tuple[tuple[float, float], tuple[float, float]]):
+    """
+    solves sites ids (global indices), checks cells of owned sites
+    :return: list of half edges of accepted owned sites as tuples
+             (site, neighbour site, start, end, next, prev) - next and prev are positions in this list,
+             and list of owned sites that have to be solved again, as pairs (site, its neighbours in tile
+             and sites nearest to vertices, that were missing)
+    """
+    points = [Point(*grid.coords[i]) for i in ids]
+    (llx, lly), (urx, ury) = bounds
+    voronoi = Voronoi(set(points), bounds=(Point(llx, lly), Point(urx, ury)))
+    voronoi.solve()
+
+    globalId = {id(p): i for p, i in zip(points, ids)}
+    edgesOfSite = {i: [] for i in owned}
+    for edge in voronoi.listEdges:
+        site = globalId[id(edge.site)]
+        if site in edgesOfSite:
+            edgesOfSite[site].append(edge)
+
+    accepted = []
+    rejected = []
+    for site, edges in edgesOfSite.items():
+        x, y = grid.coords[site]
+        missing = set()
+        for edge in edges:
+            for vertex in (edge.start, edge.end):
+                # ends cut by box (without arc) are not vertices
+                if vertex is not None and vertex.arc is not None:
+                    r = sqrt((vertex.x - x) ** 2 + (vertex.y - y) ** 2)
+                    inside = grid.insideCircle(vertex.x, vertex.y, r)
+                    # circles of wrong cells near convex hull can contain lots of sites,
+                    # the nearest to vertex are the ones that cut it off
+                    inside.sort(key=lambda i: (grid.coords[i][0] - vertex.x) ** 2 + (grid.coords[i][1] - vertex.y) ** 2)
+                    missing.update(inside[:MISSING_LIMIT])
+
+        if missing:
+            missing.update(globalId[id(edge.twin.site)] for edge in edges)
+            rejected.append((site, missing))
+        else:
+            accepted.extend(edges)
+
+    def toTuple(point: Optional[Point]):
+        return None if point is None else (point.x, point.y)
+
+    position = {id(edge): i for i, edge in enumerate(accepted)}
+    result = [(globalId[id(edge.site)], globalId[id(edge.twin.site)], toTuple(edge.start), toTuple(edge.end),
+               position.get(id(edge.next), -1), position.get(id(edge.prev), -1)) for edge in accepted]
+
+    return result, rejected
+
+
+def solveParallel(points: set[Point], tiles: Optional[int] = None, workers: Optional[int] = None) -> Diagram:
+    """
+    builds diagram in parallel strips, cells are the same as built by Voronoi(points).solve() - the same
+    half edges with the same ends, only numbering of vertices and half edges differs (sites are numbered
+    in order of iteration over points), and vertices at one place are stored once: the serial sweep adds
+    a vertex for every circle event, so where more than three sites are cocircular (e.g. grid) it has
+    several vertices with equal coordinates, stitch merges them
+    """
+    workers = workers or os.cpu_count()
+    tiles = tiles or workers
+    coords = [(p.x, p.y) for p in points]
+    n = len(coords)
+
+    lowerLeft, upperRight = getBounds(points)
+    bounds = ((lowerLeft.x, lowerLeft.y), (upperRight.x, upperRight.y))
+    hull = convexHull(coords)
+
+    byX = sorted(range(n), key=lambda i: coords[i][0])
+    width = coords[byX[-1]][0] - coords[byX[0]][0]
+    height = max(y for _, y in coords) - min(y for _, y in coords)
+    margin = 4 * sqrt(max(width * height, 1e-300) / n)
+
+    # strips with equal number of sites, with margin on both sides
+    pending = []  # type: list[tuple[set[int], list[int]]]  # sites of tile and owned sites
+    lo = 0
+    hi = 0
+    for k in range(tiles):
+        owned = byX[k * n // tiles:(k + 1) * n // tiles]
+        if not owned:
+            continue
+        while coords[byX[lo]][0] < coords[owned[0]][0] - margin:
+            lo += 1
+        while hi < n and coords[byX[hi]][0] <= coords[owned[-1]][0] + margin:
+            hi += 1
+        pending.append((set(byX[lo:hi]).union(hull), owned))
+
+    halfEdges = []
+    with ProcessPoolExecutor(workers, initializer=initWorker, initargs=(coords,)) as executor:
+        while pending:
+            futures = [executor.submit(buildTile, list(ids), owned, bounds) for ids, owned in pending]
+
+            # every rejected site is solved again alone, with its neighbours, sites that were missing
+            # and all sites of tile it was solved in before, if it was solved alone already,
+            # so its tile grows in every round
+            retry = []
+            for (ids, owned), future in zip(pending, futures):
+                result, rejected = future.result()
+                halfEdges.append(result)
+                for site, missing in rejected:
+                    retry.append(((ids if len(owned) == 1 else set(hull)).union(missing, [site]), [site]))
+            pending = retry
+
+    return stitch(coords, halfEdges)
+
+
+def stitch(coords: list[tuple[float, float]], tileEdges: list[list[tuple]]) -> Diagram:
+    diagram = Diagram()
+    for x, y in coords:
+        diagram.addSite(x, y)
+
+    vertexIndex = {}  # type: dict[tuple[float, float], int]
+
+    def getVertex(point) -> int:
+        if point is None:
+            return -1
+        if point not in vertexIndex:
+            vertexIndex[point] = diagram.addVertex(*point)
+        return vertexIndex[point]
+
+    edgeIndex = {}  # type: dict[tuple[int, int], int]  # (site, neighbour) -> half edge
+    for edges in tileEdges:
+        first = diagram.halfEdgeCount()
+        for site, neighbour, start, end, _, _ in edges:
+            i = diagram.addHalfEdge(site)
+            diagram.edgeStart[i] = getVertex(start)
+            diagram.edgeEnd[i] = getVertex(end)
+            edgeIndex[(site, neighbour)] = i
+
+        for k, (_, _, _, _, nextEdge, prevEdge) in enumerate(edges):
+            diagram.edgeNext[first + k] = -1 if nextEdge == -1 else first + nextEdge
+            diagram.edgePrev[first + k] = -1 if prevEdge == -1 else first + prevEdge
+
+    for (site, neighbour), i in edgeIndex.items():
+        diagram.edgeTwin[i] = edgeIndex.get((neighbour, site), -1)
+
+    return diagram
+
+
+if __name__ == '__main__':
+    from random import uniform
+    from time import time
+
+    test = [(uniform(0, 1000), uniform(0, 1000)) for _ in range(100000)]
+
+    start = time()
+    Voronoi(set(Point(x, y) for x, y in test)).solve()
+    print("serial", time() - start)
+
+    start = time()
+    solveParallel(set(Point(x, y) for x, y in test))
+    print("parallel", time() - start)
@@ -1,11 +1,9 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.collections as mcoll
-from matplotlib.patches import Arc
-import matplotlib.colors as mcolors
-from matplotlib.widgets import Button
 import json as js
 
+# Moduły matplotlib są importowane dopiero przy pierwszym rysowaniu, dzięki czemu plot można
+# zaimportować (np. razem z algorytmem) bez kosztu ładowania matplotlib i bez środowiska graficznego.
+
 # Parametr określający jak blisko (w odsetku całego widocznego zakresu) punktu początkowego
 # wielokąta musimy kliknąć, aby go zamknąć.
 TOLERANCE = 0.15
@@ -142,6 +140,7 @@ class _Button_callback(object):
         if not autoscaling:
             self.ax.set_xlim(xlim)
             self.ax.set_ylim(ylim)
+        import matplotlib.pyplot as plt
         plt.draw()
 
 
@@ -183,6 +182,7 @@ class LinesCollection:
         self.lines.append(line)
 
     def get_collection(self):
+        import matplotlib.collections as mcoll
         return mcoll.LineCollection(self.lines, **self.kwargs)
 
 
@@ -207,6 +207,8 @@ class Plot:
     # przycisk podajemy referencję na metodę obiektu _Button_callback, która
     # zostanie wykonana w momencie naciśnięcia.
     def __configure_buttons(self):
+        import matplotlib.pyplot as plt
+        from matplotlib.widgets import Button
         plt.subplots_adjust(bottom=0.2)
         ax_prev = plt.axes([0.6, 0.05, 0.15, 0.075])
         ax_next = plt.axes([0.76, 0.05, 0.15, 0.075])
@@ -270,6 +272,7 @@ class Plot:
 
     # Główna metoda inicjalizująca wyświetlanie wykresu.
     def draw(self, scale=True):
+        import matplotlib.pyplot as plt
         plt.close()
         fig = plt.figure()
         self.callback = _Button_callback(self.scenes)
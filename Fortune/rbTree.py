@@ -1,7 +1,6 @@
 from typing import Optional
-from math import inf
 
-from computing import getIntersectionOfParabolas
+from computing import getIntersectionX
 from dataTypes import RBNode, Point
 
 """
@@ -26,23 +25,32 @@ class RBTree:
         if self.isEmpty():
             return None
         node = self.root
+        x = point.x
+        y = point.y
 
         while True:
-            leftIntersection = Point(-inf, point.y)
-            rightIntersection = Point(inf, point.y)
             # print("       node", node.point, node.prev, node.next)
-            if node.prev is not None:
-                leftIntersection = getIntersectionOfParabolas(node.prev.point, node.point, point.y)
-
-            if node.next is not None:
-                rightIntersection = getIntersectionOfParabolas(node.point, node.next.point, point.y)
-            # print("     point", point, "left inter", leftIntersection, "right inter", rightIntersection)
-            if point.x < leftIntersection.x:
+            prevNode = node.prev
+            if prevNode is not None and x < self.getBreakpointX(prevNode, y):
                 node = node.left
-            elif point.x > rightIntersection.x:
+                continue
+
+            if node.next is not None and x > self.getBreakpointX(node, y):
                 node = node.right
-            else:
-                return node
+                continue
+
+            return node
+
+    @staticmethod
+    def getBreakpointX(node: RBNode, y: float) -> float:
+        """x of breakpoint between node and node.next for sweep line at y, cached in node"""
+        if node.breakpointY == y and node.breakpointSite is node.next.point:
+            return node.breakpointX
+
+        node.breakpointX = getIntersectionX(node.point, node.next.point, y)
+        node.breakpointY = y
+        node.breakpointSite = node.next.point
+        return node.breakpointX
 
     def insertBefore(self, beforeNode: RBNode, toInsert: RBNode) -> None:
         if beforeNode.left is None:
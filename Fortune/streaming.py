@@ -0,0 +1,199 @@
+import csv
+import os
+from array import array
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from dataTypes import Point, HalfEdge
+from rbTree import RBNode
+from voronoiFortunemethod import Voronoi, getBounds
+
+"""
+Sweep over sites that do not fit in memory. Sites are read lazily from file sorted in sweep order
+(decreasing y, then increasing x), so site events are taken from the reader instead of event queue, which holds only circle events.
+Sites, vertices and half edges are written to files in a directory as soon as they are known (half edges when
+both their ends are set), and finished half edges are unlinked from the rest, so memory used by the sweep
+depends on size of beach line, not on number of sites.
+
+Files (raw little endian arrays, see loadStreamed):
+    sites.bin - float64 x, y of site i
+    vertices.bin - float64 x, y of vertex i
+    edges.bin - int64 site, neighbour site (site of twin), start vertex, end vertex (-1 if missing) of half edge
+"""
+
+CHUNK_SIZE = 1 << 16  # sites read, or values written at once
+
+
+def readBinary(path: str, chunkSize: int = CHUNK_SIZE) -> Iterator[Point]:
+    """sites from file of float64 x, y pairs, read through memory map, chunk by chunk"""
+    if os.path.getsize(path) == 0:
+        return
+    coords = np.memmap(path, dtype='<f8', mode='r').reshape(-1, 2)
+    for start in range(0, len(coords), chunkSize):
+        for x, y in coords[start:start + chunkSize].tolist():
+            yield Point(x, y)
+
+
+def readCSV(path: str) -> Iterator[Point]:
+    """sites from csv file with x, y in first two columns, lines not starting with number are skipped"""
+    with open(path, newline='') as file:
+        for row in csv.reader(file):
+            try:
+                yield Point(float(row[0]), float(row[1]))
+            except (ValueError, IndexError):
+                continue
+
+
+def writeSorted(points: Iterable[tuple[float, float]], path: str) -> None:
+    """writes sites to binary file in sweep order, for sets fitting in memory"""
+    coords = np.asarray(list(points), dtype='<f8').reshape(-1, 2)
+    coords[np.lexsort((coords[:, 0], -coords[:, 1]))].tofile(path)
+
+
+def binaryBounds(path: str, chunkSize: int = CHUNK_SIZE) -> tuple[Point, Point]:
+    """the same box as getBounds computes for sites in binary file, in one pass over it"""
+    coords = np.memmap(path, dtype='<f8', mode='r').reshape(-1, 2)
+    low = np.full(2, np.inf)
+    high = np.full(2, -np.inf)
+    for start in range(0, len(coords), chunkSize):
+        chunk = coords[start:start + chunkSize]
+        low = np.minimum(low, chunk.min(axis=0))
+        high = np.maximum(high, chunk.max(axis=0))
+    return getBounds([Point(*low.tolist()), Point(*high.tolist())])
+
+
+def loadStreamed(directory: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """sites (n, 2), vertices (m, 2) and half edges (k, 4) written by StreamingVoronoi, memory mapped"""
+    def load(name, dtype, width):
+        path = os.path.join(directory, name)
+        if os.path.getsize(path) == 0:
+            return np.zeros((0, width), dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r').reshape(-1, width)
+
+    return load('sites.bin', '<f8', 2), load('vertices.bin', '<f8', 2), load('edges.bin', '<i8', 4)
+
+
+class DiagramWriter:
+    """the same addSite, addVertex as Diagram, but elements are appended to files instead of tables"""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.files = [open(os.path.join(directory, name), 'wb') for name in ('sites.bin', 'vertices.bin', 'edges.bin')]
+        self.buffers = [array('d'), array('d'), array('q')]
+        self.sites = 0
+        self.vertices = 0
+        self.halfEdges = 0
+
+    def append(self, table: int, *values) -> None:
+        buffer = self.buffers[table]
+        buffer.extend(values)
+        if len(buffer) >= CHUNK_SIZE:
+            self.files[table].write(buffer.tobytes())
+            del buffer[:]
+
+    def addSite(self, x: float, y: float) -> int:
+        self.append(0, x, y)
+        self.sites += 1
+        return self.sites - 1
+
+    def addVertex(self, x: float, y: float) -> int:
+        self.append(1, x, y)
+        self.vertices += 1
+        return self.vertices - 1
+
+    def addHalfEdge(self, edge: HalfEdge) -> int:
+        def getIndex(point):
+            return -1 if point is None else point.index
+
+        self.append(2, edge.site.index, edge.twin.site.index, getIndex(edge.start), getIndex(edge.end))
+        self.halfEdges += 1
+        return self.halfEdges - 1
+
+    def close(self) -> None:
+        for file, buffer in zip(self.files, self.buffers):
+            file.write(buffer.tobytes())
+            file.close()
+
+
+class StreamingVoronoi(Voronoi):
+    def __init__(self, sites: Iterable[Point], bounds: tuple[Point, Point], directory: str):
+        """
+        :param sites: sites in sweep order - by decreasing y (equal y by increasing x), without duplicates
+        :param bounds: lower left and upper right corner of box cutting infinite edges, e.g. from binaryBounds
+        :param directory: where diagram is written
+        """
+        # vertices keeps only vertices added by endHalfEdges, listEdges stays empty - half edges go to file
+        self.initSweep(DiagramWriter(directory))
+        self.sites = iter(sites)
+        self.lowerLeft, self.upperRight = bounds
+
+    def solve(self):
+        """sweeps through all sites, writes the diagram and closes its files"""
+        site = next(self.sites, None)
+        last = site
+        while site is not None or not self.events.empty():
+            # site goes before circle event with the same y, as in Voronoi.solve
+            if site is not None and (self.events.empty() or site.y >= self.events.peekY()):
+                if site.y > last.y or (site.y == last.y and site.x < last.x):
+                    raise ValueError("sites are not sorted by decreasing y and increasing x: " + str(site))
+                last = site
+                site.index = self.diagram.addSite(site.x, site.y)
+                self.handleSiteEvent(site)
+                site = next(self.sites, None)
+            else:
+                _, p = self.events.get()
+                self.handleCircleEvent(p)
+                self.vertices.discard(p)
+
+        self.endHalfEdges()
+
+        # half edges that are left are breakpoints of beach line
+        if not self.beachLine.isEmpty():
+            arc = self.beachLine.minimum(self.beachLine.root)
+            while arc.next is not None:
+                self.flushEdge(arc.rightHalfEdge, True)
+                arc = arc.next
+        self.diagram.close()
+
+    def addEdge(self, left: RBNode, right: RBNode):
+        left.rightHalfEdge = HalfEdge(left.point)
+        right.leftHalfEdge = HalfEdge(right.point)
+        left.rightHalfEdge.twin = right.leftHalfEdge
+        right.leftHalfEdge.twin = left.rightHalfEdge
+
+    def removeArc(self, arc: RBNode, point: Point):
+        super().removeArc(arc, point)
+
+        # half edges of removed arc got their last vertex
+        self.flushEdge(arc.leftHalfEdge)
+        if arc.rightHalfEdge is not arc.leftHalfEdge:
+            self.flushEdge(arc.rightHalfEdge)
+
+    def flushEdge(self, edge: HalfEdge, infinite: bool = False):
+        """writes half edge with its twin if both its ends are set (or it can be infinite), and unlinks both"""
+        if edge.twin is None or (not infinite and (edge.start is None or edge.end is None)):
+            return
+
+        for halfEdge in (edge, edge.twin):
+            self.diagram.addHalfEdge(halfEdge)
+        for halfEdge in (edge.twin, edge):
+            halfEdge.next = halfEdge.prev = halfEdge.twin = None
+            for vertex in (halfEdge.start, halfEdge.end):
+                if vertex is not None:
+                    vertex.arc = None
+
+
+if __name__ == '__main__':
+    import tempfile
+    from random import uniform
+    from time import time
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'sites.bin')
+    writeSorted([(uniform(0, 1000), uniform(0, 1000)) for _ in range(100000)], path)
+
+    start = time()
+    StreamingVoronoi(readBinary(path), binaryBounds(path), os.path.join(directory, 'diagram')).solve()
+    sites, vertices, halfEdges = loadStreamed(os.path.join(directory, 'diagram'))
+    print(len(sites), "sites", len(vertices), "vertices", len(halfEdges), "half edges", time() - start)
@@ -0,0 +1,19 @@
+from dataTypes import Point
+from diagram import Diagram
+from voronoiFortunemethod import Voronoi, getBounds
+
+"""
+Headless core of Fortune's construction - `from voronoi import Voronoi` loads only the sweep and its tables,
+written in pure python. Nothing here imports matplotlib (plot module imports it on first drawing) or numpy
+(imported by clipping, analytics and array kernels when they are first used), so short lived processes
+start fast and need no display.
+"""
+
+__all__ = ['Point', 'Diagram', 'Voronoi', 'getBounds']
+
+
+if __name__ == '__main__':
+    import sys
+
+    heavy = [name for name in ('numpy', 'numba', 'matplotlib') if name in sys.modules]
+    print("modules loaded with core:", heavy or "none")
@@ -1,12 +1,18 @@
-from queue import PriorityQueue
 from math import inf
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 from random import uniform
 
 from computing import getConvergencePoint, det
 from dataTypes import Point, HalfEdge
+from diagram import Diagram
+from eventQueue import EventQueue, SITE
+from instrumentation import SweepStats, instrument
+from ordering import siteOrder
 from rbTree import RBTree, RBNode
 
+if TYPE_CHECKING:
+    from clipping import CellPolygons
+
 
 """
 Inspiration:
@@ -14,33 +20,67 @@ https://pvigier.github.io/2018/11/18/fortune-algorithm-details.html
 """
 
 class Voronoi:
-    def __init__(self, points: set[Point]):
+    def __init__(self, points: set[Point], order: Optional[str] = None,
+                 bounds: Optional[tuple[Point, Point]] = None, stats: Optional[SweepStats] = None):
+        """
+        :param order: layout of sites in memory - None (iteration order of points) or 'hilbert', see ordering module
+        :param bounds: lower left and upper right corner of box cutting infinite edges, computed from points if None
+        :param stats: counters and timers of sweep, see instrumentation module (no overhead if None)
+        """
         self.points = points
-        self.events = PriorityQueue()  # type: PriorityQueue[tuple[float, Point]]
+        self.initSweep(Diagram())
+
+        if bounds is None:
+            self.setBounds()
+        else:
+            self.lowerLeft, self.upperRight = bounds
+        self.sites = siteOrder(points, self.lowerLeft, self.upperRight, order)  # type: list[Point]
+        self.addSites()
+
+        if stats is not None:
+            instrument(self, stats)
+
+    def initSweep(self, diagram: Diagram):
+        """empty event queue and beach line, diagram is where the result goes"""
+        self.events = EventQueue()
         self.beachLine = RBTree()
-        self.notValidEvents = set()  # type: set[Point]
         self.vertices = set()  # type: set[Point]
         self.listEdges = []  # type: list[HalfEdge]
+        self.diagram = diagram
 
-        self.setBounds()
-        for p in points:
-            self.events.put(p.toPQ())
+    def addSites(self):
+        for p in self.sites:
+            p.index = self.diagram.addSite(p.x, p.y)
+        self.events.putAll(self.sites)
+
+    def reset(self):
+        """
+        prepares next solve after sites (the same Point objects) were moved - box, order of sites
+        and allocated tables are kept, sites must stay inside the box
+        """
+        self.events.clear()
+        self.beachLine = RBTree()
+        self.vertices.clear()
+        self.listEdges.clear()
+        self.diagram.clear()
+
+        for p in self.sites:
+            p.edge = None
+            p.setOrdering(p.y)
+        self.addSites()
 
     def solve(self):
         while self.events.empty() is False:
-            y, p = self.events.get()
-            # print(y, p)
-            # print(self.notValidEvents)
-            # print(p in self.notValidEvents)
-            if p in self.notValidEvents:
-                continue
+            kind, p = self.events.get()
+            # print(p)
 
-            if p in self.points:
+            if kind == SITE:
                 self.handleSiteEvent(p)
             else:
                 self.handleCircleEvent(p)
 
         self.endHalfEdges()
+        self.storeHalfEdges()
 
     def handleSiteEvent(self, point: Point):
         if self.beachLine.isEmpty() is True:
@@ -49,9 +89,16 @@ class Voronoi:
 
         arcAbove = self.beachLine.getNodeAbove(point)
 
+        if arcAbove.point.y == point.y:
+            # all arcs are of sites with the greatest y - their parabolas are vertical rays, so new arc does not
+            # divide the arc above, it goes after it (sites with equal y come by increasing x, arc above is the last)
+            newArc = RBNode(point)
+            self.beachLine.insertAfter(arcAbove, newArc)
+            self.addEdge(arcAbove, newArc)
+            return
+
         # print("arcAbove", arcAbove.point)
-        if arcAbove.triggeredBy is not None:
-            self.notValidEvents.add(arcAbove.triggeredBy)
+        self.events.cancel(arcAbove.triggeredBy)
 
         leftArc, midArc, rightArc = self.breakArc(arcAbove, point)
 
@@ -88,36 +135,33 @@ class Voronoi:
         return leftArc, midArc, rightArc
 
     def addCircleEvent(self, leftArc: RBNode, midArc: RBNode, rightArc: RBNode,
-                       point: Point):  
-        convergencePoint, y = getConvergencePoint(leftArc.point, midArc.point, rightArc.point)
-
-        # print("convergenece point", y, convergencePoint)
-        if convergencePoint is None or point is None or y is None:
+                       point: Point):
+        # breakpoints converge only if arcs turn clockwise (exact test, collinear points never converge)
+        if point is None or det(leftArc.point, midArc.point, rightArc.point) >= 0:
             return
-         
-        d1 = det(leftArc.point, midArc.point, rightArc.point) > 0 #counter clockwise
-        
-        if y > point.y or d1:
+
+        convergencePoint, y = getConvergencePoint(leftArc.point, midArc.point, rightArc.point)
+        if convergencePoint is None:
             return
 
+        # converging breakpoints meet at or below sweep line, y above it is only rounding error
+        y = min(y, point.orderingY)
+
         convergencePoint.arc = midArc
         convergencePoint.setOrdering(y)
 
-        midArc.triggeredBy = convergencePoint
-        self.events.put(convergencePoint.toPQ())
+        midArc.triggeredBy = self.events.put(convergencePoint, y)
 
     def handleCircleEvent(self, point: Point):
+        point.index = self.diagram.addVertex(point.x, point.y)
         self.vertices.add(point)
 
         leftArc = point.arc.prev
         midArc = point.arc
         rightArc = point.arc.next
 
-        if leftArc.triggeredBy is not None:
-            self.notValidEvents.add(leftArc.triggeredBy)
-
-        if rightArc.triggeredBy is not None:
-            self.notValidEvents.add(rightArc.triggeredBy)
+        self.events.cancel(leftArc.triggeredBy)
+        self.events.cancel(rightArc.triggeredBy)
 
         self.removeArc(midArc, point)
 
@@ -162,7 +206,7 @@ class Voronoi:
     def addEdge(self, left: RBNode, right: RBNode):
         # print("from", left.point, "to", right.point)
         def attachEdgeToPoint(point):
-            newHalfEdge = HalfEdge()
+            newHalfEdge = HalfEdge(point, self.diagram.addHalfEdge(point.index))
             if point.edge is None:
                 point.edge = newHalfEdge
             self.listEdges.append(newHalfEdge)
@@ -171,20 +215,33 @@ class Voronoi:
         left.rightHalfEdge = attachEdgeToPoint(left.point)
         right.leftHalfEdge = attachEdgeToPoint(right.point)
 
-    def setBounds(self):
-        maxX = max(self.points, key=lambda p: p.x).x
-        maxY = max(self.points, key=lambda p: p.y).y
-        minX = min(self.points, key=lambda p: p.x).x
-        minY = min(self.points, key=lambda p: p.y).y
+        left.rightHalfEdge.twin = right.leftHalfEdge
+        right.leftHalfEdge.twin = left.rightHalfEdge
+        self.diagram.edgeTwin[left.rightHalfEdge.index] = right.leftHalfEdge.index
+        self.diagram.edgeTwin[right.leftHalfEdge.index] = left.rightHalfEdge.index
+
+    def storeHalfEdges(self):
+        """writes start, end, next and prev of every half edge to diagram tables"""
+        def getIndex(element):
+            return -1 if element is None else element.index
 
-        # print(maxX, maxY, minX, minY)
+        diagram = self.diagram
+        for edge in self.listEdges:
+            i = edge.index
+            diagram.edgeStart[i] = getIndex(edge.start)
+            diagram.edgeEnd[i] = getIndex(edge.end)
+            diagram.edgeNext[i] = getIndex(edge.next)
+            diagram.edgePrev[i] = getIndex(edge.prev)
 
-        divBy = 10
-        addX = (maxX - minY) / divBy
-        addY = (maxY - minY) / divBy
+    def getCellPolygons(self) -> 'CellPolygons':
+        """closed polygons of all cells cut by the box, indexed like sites in diagram"""
+        # clipping needs numpy, imported only when polygons are asked for
+        from clipping import cellPolygons
 
-        self.lowerLeft = Point(minX - addX, minY - addY)
-        self.upperRight = Point(maxX + addX, maxY + addY)
+        return cellPolygons(self.diagram, self.lowerLeft, self.upperRight)
+
+    def setBounds(self):
+        self.lowerLeft, self.upperRight = getBounds(self.points)
 
     def getIntersectionWithBox(self, point: Point, direction: Point) -> Optional[Point]:
         def calculatePoint(t: float) -> Point:
@@ -219,7 +276,7 @@ class Voronoi:
             test = leftArc.rightHalfEdge.end
             if test is None or test.x < self.lowerLeft.x or test.x > self.upperRight.x or \
                     test.y < self.lowerLeft.y or test.y > self.upperRight.y:
-                # TODO tutaj mozna skonczyc te krawedzie ktore wychodza poza box
+                # edges going out of the box are finished by getCellPolygons
                 leftArc = rightArc
                 rightArc = rightArc.next
                 continue
@@ -235,15 +292,34 @@ class Voronoi:
             orientation = Point(-diffY, diffX)
 
             intersection = self.getIntersectionWithBox(tmpPoint, orientation)
-            self.vertices.add(intersection)
+            # no intersection (zero direction) - half edge stays without end, its edgeEnd is -1
+            if intersection is not None:
+                intersection.index = self.diagram.addVertex(intersection.x, intersection.y)
+                self.vertices.add(intersection)
 
-            leftArc.rightHalfEdge.start = intersection
-            rightArc.leftHalfEdge.end = intersection
+                leftArc.rightHalfEdge.start = intersection
+                rightArc.leftHalfEdge.end = intersection
 
             leftArc = rightArc
             rightArc = rightArc.next
 
 
+def getBounds(points: Iterable[Point]) -> tuple[Point, Point]:
+    """lower left and upper right corner of box around points, with margin"""
+    maxX = max(points, key=lambda p: p.x).x
+    maxY = max(points, key=lambda p: p.y).y
+    minX = min(points, key=lambda p: p.x).x
+    minY = min(points, key=lambda p: p.y).y
+
+    # print(maxX, maxY, minX, minY)
+
+    divBy = 10
+    addX = (maxX - minX) / divBy
+    addY = (maxY - minY) / divBy
+
+    return Point(minX - addX, minY - addY), Point(maxX + addX, maxY + addY)
+
+
 if __name__ == '__main__':
     test = [(5, 60), (20, 10), (40, 80), (60, 40), (80, 75), (75, 20)]
 #     test = [(uniform(0,1000), uniform(0,1000)) for _ in range(8)]
@@ -260,6 +336,9 @@ if __name__ == '__main__':
     pprint(voronoi.listEdges)
     pprint(voronoi.vertices)
 
+    polygons = voronoi.getCellPolygons()
+    for i in range(len(polygons)):
+        print(voronoi.diagram.getSite(i), polygons.polygon(i))
 
     edge = point.edge
     curr = edge.next
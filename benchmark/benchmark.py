@@ -0,0 +1,245 @@
+"""
+Benchmark of both construction methods - Fortune's sweep (Voronoi.solve) and Bowyer-Watson
+(delaunay + voronoi_diagram) - over sizes and distributions of sites.
+
+Every case runs in a separate process (started in directory of its method, both use flat imports),
+so peak memory of one case does not hide the next one, and case exceeding time limit can be stopped.
+Events are site and circle events handled by the sweep, and inserted points and edges checked
+by legalize in Bowyer-Watson - they are counted in a second, untimed run, the timed one is plain
+solve. Results are written as JSON; given baseline results, cases slower (or using more memory)
+than baseline times threshold are reported as regressions and the script exits with status 1.
+
+    python benchmark/benchmark.py --sizes 100 1000 10000 --output results.json
+    python benchmark/benchmark.py --sizes 100 1000 10000 --baseline results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINES = {'fortune': 'Fortune', 'delaunay': 'Delaunay'}  # engine -> directory
+DISTRIBUTIONS = ('uniform', 'clustered', 'grid', 'collinear', 'cocircular')
+SIZES = (100, 1000, 10000, 100000, 1000000)
+THRESHOLDS = {'time': 1.25, 'peak_memory': 1.25}
+MIN_TIME = 0.05  # seconds, shorter runs are too noisy to be compared
+FORMAT_VERSION = 1
+
+
+def generate(distribution, n, seed):
+    """(n, 2) array of sites"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    if distribution == 'uniform':
+        return rng.uniform(0, 1000, (n, 2))
+    if distribution == 'clustered':
+        centers = rng.uniform(0, 1000, (20, 2))
+        return centers[rng.integers(0, 20, n)] + rng.normal(0, 5, (n, 2))
+    if distribution == 'grid':
+        side = int(np.ceil(np.sqrt(n)))
+        return np.column_stack((np.arange(n) % side, np.arange(n) // side)).astype(float) * 10
+    if distribution == 'collinear':
+        x = rng.uniform(0, 1000, n)
+        return np.column_stack((x, 0.5 * x + 3))
+    if distribution == 'cocircular':
+        angle = rng.uniform(0, 2 * np.pi, n)
+        radius = 500 * (1 + rng.uniform(-1e-9, 1e-9, n))
+        return np.column_stack((500 + radius * np.cos(angle), 500 + radius * np.sin(angle)))
+    raise ValueError("unknown distribution: " + distribution)
+
+
+def peak_memory():
+    """peak resident memory of this process in bytes"""
+    import resource
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def run_fortune(points):
+    """time of plain solve"""
+    from dataTypes import Point
+    from voronoiFortunemethod import Voronoi
+
+    sites = set(Point(x, y) for x, y in points.tolist())
+    start = time.perf_counter()
+    Voronoi(sites).solve()
+    return time.perf_counter() - start
+
+
+def count_fortune(points):
+    """events of solve, counted in a separate run as counters slow the sweep down"""
+    from dataTypes import Point
+    from instrumentation import SweepStats
+    from voronoiFortunemethod import Voronoi
+
+    stats = SweepStats()
+    Voronoi(set(Point(x, y) for x, y in points.tolist()), stats=stats).solve()
+    return stats.counters['siteEvents'] + stats.counters['circleEvents']
+
+
+def run_delaunay(points):
+    """time of triangulation and Voronoi diagram built from it"""
+    import delaunay
+
+    lower_left = points.min(axis=0) - 1
+    upper_right = points.max(axis=0) + 1
+
+    start = time.perf_counter()
+    triangles, neighbours = delaunay.delaunay(points)
+    delaunay.voronoi_diagram(points, triangles, neighbours, lower_left, upper_right)
+    return time.perf_counter() - start
+
+
+def count_delaunay(points):
+    """inserted points and legalized edges, counted in a separate run"""
+    import delaunay
+
+    counter = {'events': 0}
+
+    class CountingTriangulation(delaunay.Triangulation):
+        def insert_point(self, p):
+            counter['events'] += 1
+            super().insert_point(p)
+
+        def legalize_edge(self, t):
+            counter['events'] += 1
+            return super().legalize_edge(t)
+
+    # delaunay() creates triangulation by name from its module
+    plain = delaunay.Triangulation
+    delaunay.Triangulation = CountingTriangulation
+    try:
+        delaunay.delaunay(points)
+    finally:
+        delaunay.Triangulation = plain
+    return counter['events']
+
+
+RUNS = {'fortune': (run_fortune, count_fortune), 'delaunay': (run_delaunay, count_delaunay)}
+
+
+def run_case(engine, distribution, n, seed):
+    """runs one case in this process, started in directory of the engine"""
+    sys.path.insert(0, os.path.join(ROOT, ENGINES[engine]))
+    sys.path.insert(1, ROOT)  # shared geometry package, if it is not installed
+    points = generate(distribution, n, seed)
+    run, count = RUNS[engine]
+
+    # small run loads lazily imported modules (and compiles numba kernels) before measuring,
+    # timed run goes before counting, so neither its time nor peak memory includes counters
+    run(points[:10])
+    before = peak_memory()
+    elapsed = run(points)
+    memory = peak_memory() - before
+    return {'time': elapsed, 'peak_memory': memory, 'events': count(points)}
+
+
+def measure(engine, distribution, n, seed, repeat, timeout):
+    """runs case in separate processes, the best of repeat runs is kept"""
+    result = {'engine': engine, 'distribution': distribution, 'n': n, 'seed': seed}
+    best = None
+    for _ in range(repeat):
+        try:
+            process = subprocess.run([sys.executable, os.path.abspath(__file__), '--case', engine, distribution,
+                                      str(n), str(seed)], capture_output=True, text=True, timeout=timeout,
+                                     cwd=os.path.join(ROOT, ENGINES[engine]))
+        except subprocess.TimeoutExpired:
+            result['error'] = "timeout after " + str(timeout) + " s"
+            return result
+        if process.returncode != 0:
+            lines = process.stderr.strip().splitlines()
+            result['error'] = lines[-1] if lines else "exit status " + str(process.returncode)
+            return result
+
+        run = json.loads(process.stdout.strip().splitlines()[-1])
+        if best is None or run['time'] < best['time']:
+            best = run
+
+    result.update(best)
+    return result
+
+
+def compare(results, baseline, thresholds):
+    """:return: list of descriptions of regressions against baseline"""
+    old = {(r['engine'], r['distribution'], r['n']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        previous = old.get((result['engine'], result['distribution'], result['n']))
+        if previous is None:
+            continue
+        name = result['engine'] + " " + result['distribution'] + " n=" + str(result['n'])
+
+        if 'error' in result and 'error' not in previous:
+            regressions.append(name + ": " + result['error'])
+            continue
+        if 'error' in result or 'error' in previous:
+            continue
+
+        for key, threshold in thresholds.items():
+            if key == 'time' and previous['time'] < MIN_TIME:
+                continue
+            if previous[key] > 0 and result[key] > previous[key] * threshold:
+                regressions.append("%s: %s %.4g -> %.4g (x%.2f, threshold x%.2f)" % (
+                    name, key, previous[key], result[key], result[key] / previous[key], threshold))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of Fortune and Bowyer-Watson constructions")
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument('--distributions', nargs='+', default=list(DISTRIBUTIONS), choices=DISTRIBUTIONS)
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(SIZES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help="runs of every case, the fastest is kept")
+    parser.add_argument('--timeout', type=float, default=600, help="seconds for one run")
+    parser.add_argument('--output', help="file for JSON results (printed if not given)")
+    parser.add_argument('--baseline', help="JSON results to compare with")
+    parser.add_argument('--threshold', type=float, help="allowed ratio to baseline, for time and memory")
+    parser.add_argument('--case', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        engine, distribution, n, seed = args.case
+        print(json.dumps(run_case(engine, distribution, int(n), int(seed))))
+        return
+
+    results = []
+    for engine in args.engines:
+        for distribution in args.distributions:
+            for n in args.sizes:
+                result = measure(engine, distribution, n, args.seed, args.repeat, args.timeout)
+                results.append(result)
+                print(engine, distribution, n, result.get('error') or "%.3f s" % result['time'], file=sys.stderr)
+
+    thresholds = dict(THRESHOLDS)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        thresholds.update(baseline.get('thresholds', {}))
+    if args.threshold:
+        thresholds = {key: args.threshold for key in thresholds}
+
+    report = {'version': FORMAT_VERSION, 'python': platform.python_version(), 'platform': platform.platform(),
+              'thresholds': thresholds, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=1)
+    else:
+        print(json.dumps(report, indent=1))
+
+    if baseline is not None:
+        regressions = compare(results, baseline, thresholds)
+        for regression in regressions:
+            print("regression:", regression, file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
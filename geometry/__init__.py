@@ -0,0 +1,5 @@
+"""
+Geometric predicates (exact orientation, in circle and in power tests) and array kernels shared by both
+constructions - Fortune's sweep (Fortune/computing.py) and Bowyer-Watson (Delaunay/delaunay.py).
+Importing the package loads only pure python modules, numpy and numba are imported by array kernels when used.
+"""
@@ -0,0 +1,90 @@
+import os
+from importlib.util import find_spec
+from math import nan
+
+from geometry.predicates import ORIENT_BOUND, orient2d, orient2dRatio, incircle, inpower, circumcenter, powerCenter, ratioToFloat
+
+"""
+Geometric kernels used by both constructions, with backend chosen at import: 'numba' if numba is installed,
+'python' (numpy) otherwise, environment variable VORONOI_BACKEND=python forces the second one. Neither numpy
+nor numba is imported before the first array kernel is called, so the sweep alone loads only pure python modules.
+
+Scalar predicates (orient2d, incircle, inpower, circumcenter, powerCenter - one test per call, as the sweep
+and edge flips need them) are the pure python ones from predicates module in both backends - call of compiled
+function from python costs more than the few float operations it would save. Backends differ in array kernels,
+which test many triangles in one call: float value is filtered for every element (NaN where the error bound
+can not decide the sign), then undecided elements are computed exactly, so both backends give identical results.
+"""
+
+HAS_NUMBA = find_spec('numba') is not None
+BACKEND = 'numba' if HAS_NUMBA and os.environ.get('VORONOI_BACKEND', 'numba') != 'python' else 'python'
+
+
+def orientFilter(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+    """orient2d in floats, NaN if rounding error may change its sign"""
+    left = (ax - cx) * (by - cy)
+    right = (ay - cy) * (bx - cx)
+    det = left - right
+    if abs(det) > ORIENT_BOUND * (abs(left) + abs(right)):
+        return det
+    return nan
+
+
+def orientFilterNumpy(ax, ay, bx, by, cx, cy):
+    """orientFilter for arrays (or numbers, broadcast like in numpy)"""
+    import numpy as np
+
+    left = (ax - cx) * (by - cy)
+    right = (ay - cy) * (bx - cx)
+    det = left - right
+    return np.where(np.abs(det) > ORIENT_BOUND * (np.abs(left) + np.abs(right)), det, np.nan)
+
+
+compiled = {}  # numba ufuncs by name, compiled on first call
+
+
+def orientFilterCompiled(ax, ay, bx, by, cx, cy):
+    """orientFilter compiled by numba to ufunc"""
+    if 'orient' not in compiled:
+        import numba
+        compiled['orient'] = numba.vectorize(['float64(float64, float64, float64, float64, float64, float64)'],
+                                             cache=True)(orientFilter)
+    return compiled['orient'](ax, ay, bx, by, cx, cy)
+
+
+orientFilterArray = orientFilterCompiled if BACKEND == 'numba' else orientFilterNumpy
+
+
+def orient2dArray(ax, ay, bx, by, cx, cy):
+    """orient2d of arrays of points (numbers are broadcast), sign of every element is exact"""
+    import numpy as np
+
+    ax, ay, bx, by, cx, cy = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64)
+                                                   for value in (ax, ay, bx, by, cx, cy)))
+    det = np.array(orientFilterArray(ax, ay, bx, by, cx, cy), dtype=np.float64)
+    for k in np.flatnonzero(np.isnan(det)).tolist():
+        i = np.unravel_index(k, det.shape)
+        det[i] = ratioToFloat(*orient2dRatio(ax[i], ay[i], bx[i], by[i], cx[i], cy[i]))
+    return det
+
+
+if __name__ == '__main__':
+    from random import Random
+    from time import time
+
+    import numpy as np
+
+    # time of both backends (if numba is installed) on random points, the first call compiles numba kernel
+    # (or loads it from cache), so the second one is timed - equality of results is checked by tests
+    random = Random(0)
+    points = np.array([[random.uniform(-1, 1) for _ in range(6)] for _ in range(100000)])
+
+    for name, kernel in (('python', orientFilterNumpy), ('numba', orientFilterCompiled)):
+        if name == 'numba' and not HAS_NUMBA:
+            print(name, "not installed")
+            continue
+        orientFilterArray = kernel
+        orient2dArray(*points.T)
+        start = time()
+        orient2dArray(*points.T)
+        print(name, time() - start)
@@ -0,0 +1,217 @@
+from fractions import Fraction
+from math import inf, lcm
+
+"""
+Geometric predicates with exact sign (orientation, in circle and its version for weighted points). Value is computed in floats first, and it is returned if it is further
+from zero than bound of its rounding error (static filter from J. R. Shewchuk, "Adaptive Precision Floating-Point
+Arithmetic and Fast Robust Geometric Predicates"). Only when it is not, the determinant is computed again exactly
+- every float is an integer times a power of two, so all inputs are integers after multiplying them by one common
+power of two, and determinant of integers has no rounding at all. Exact path costs a few microseconds (integer
+arithmetic, no Fraction is built on the way to the sign), and it is taken only for (nearly) degenerate input:
+collinear or cocircular points.
+
+Used by both constructions - Fortune's sweep (computing module) and Bowyer-Watson (Delaunay/delaunay.py).
+"""
+
+EPSILON = 2.0 ** -53  # half of machine epsilon, the largest relative error of one float operation
+ORIENT_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+INCIRCLE_BOUND = (10.0 + 96.0 * EPSILON) * EPSILON
+# inpower: every difference (adx, ..., adw) has relative error at most EPSILON, square and sum in asquare add two
+# more roundings and subtraction of adw one, so lifted value asquare - adw is off by at most 5 * EPSILON *
+# (asquare + |adw|); bcdet is off by 4 * EPSILON * (|bdx * cdy| + |cdx * bdy|), their product rounds once more
+# and two additions of the three terms add two, which gives 12 * EPSILON * permanent plus terms of order
+# EPSILON ** 2 - 16 leaves a margin of 4 * EPSILON * permanent for them and for rounding of permanent itself
+INPOWER_BOUND = (16.0 + 128.0 * EPSILON) * EPSILON
+
+SMALLEST = 5e-324  # returned instead of nonzero exact values too small for float
+
+
+def toFloat(value: Fraction) -> float:
+    """float with the same sign as value"""
+    return ratioToFloat(value.numerator, value.denominator)
+
+
+def ratioToFloat(numerator: int, denominator: int) -> float:
+    """float with the same sign as numerator / denominator (denominator is positive)"""
+    try:
+        result = numerator / denominator
+    except OverflowError:
+        return inf if numerator > 0 else -inf
+    if result == 0 and numerator != 0:
+        return SMALLEST if numerator > 0 else -SMALLEST
+    return result
+
+
+def orient2d(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+    """
+    positive if a, b, c go counter clockwise, negative if clockwise, zero if collinear
+    (twice the signed area of triangle, sign is always exact)
+    """
+    left = (ax - cx) * (by - cy)
+    right = (ay - cy) * (bx - cx)
+    det = left - right
+    if abs(det) > ORIENT_BOUND * (abs(left) + abs(right)):
+        return det
+
+    return ratioToFloat(*orient2dRatio(ax, ay, bx, by, cx, cy))
+
+
+def integers(values) -> tuple[list[int], int]:
+    """values (floats, ints or fractions) as integers over their common denominator, and the denominator"""
+    try:
+        ratios = [value.as_integer_ratio() for value in values]
+    except AttributeError:
+        # numpy integers have no as_integer_ratio
+        ratios = [Fraction(value).as_integer_ratio() for value in values]
+    scale = lcm(*[denominator for _, denominator in ratios])
+    return [numerator * (scale // denominator) for numerator, denominator in ratios], scale
+
+
+def orient2dRatio(ax, ay, bx, by, cx, cy) -> tuple[int, int]:
+    """exact orient2d as integer numerator and positive denominator"""
+    (ax, ay, bx, by, cx, cy), scale = integers((ax, ay, bx, by, cx, cy))
+    return (ax - cx) * (by - cy) - (ay - cy) * (bx - cx), scale * scale
+
+
+def orient2dExact(ax, ay, bx, by, cx, cy) -> Fraction:
+    return Fraction(*orient2dRatio(ax, ay, bx, by, cx, cy))
+
+
+def incircle(ax: float, ay: float, bx: float, by: float, cx: float, cy: float, dx: float, dy: float) -> float:
+    """
+    positive if d lies inside circle through a, b, c given counter clockwise (outside, if clockwise),
+    zero if the points are cocircular, sign is always exact
+    """
+    adx = ax - dx
+    ady = ay - dy
+    bdx = bx - dx
+    bdy = by - dy
+    cdx = cx - dx
+    cdy = cy - dy
+
+    bcdet = bdx * cdy - cdx * bdy
+    cadet = cdx * ady - adx * cdy
+    abdet = adx * bdy - bdx * ady
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+
+    det = alift * bcdet + blift * cadet + clift * abdet
+    permanent = ((abs(bdx * cdy) + abs(cdx * bdy)) * alift +
+                 (abs(cdx * ady) + abs(adx * cdy)) * blift +
+                 (abs(adx * bdy) + abs(bdx * ady)) * clift)
+    if abs(det) > INCIRCLE_BOUND * permanent:
+        return det
+
+    return ratioToFloat(*incircleRatio(ax, ay, bx, by, cx, cy, dx, dy))
+
+
+def incircleRatio(ax, ay, bx, by, cx, cy, dx, dy) -> tuple[int, int]:
+    """exact incircle as integer numerator and positive denominator"""
+    (ax, ay, bx, by, cx, cy, dx, dy), scale = integers((ax, ay, bx, by, cx, cy, dx, dy))
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+
+    return ((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) +
+            (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) +
+            (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady)), scale ** 4
+
+
+def incircleExact(ax, ay, bx, by, cx, cy, dx, dy) -> Fraction:
+    return Fraction(*incircleRatio(ax, ay, bx, by, cx, cy, dx, dy))
+
+
+def inpower(ax: float, ay: float, aw: float, bx: float, by: float, bw: float, cx: float, cy: float, cw: float,
+            dx: float, dy: float, dw: float) -> float:
+    """
+    incircle for weighted points (power distance |x - p|^2 - w) - positive if d lifted to x^2 + y^2 - w lies below
+    plane through lifted a, b, c given counter clockwise, so d is not redundant for triangle abc,
+    zero if all four lie on one plane, sign is always exact
+    """
+    adx = ax - dx
+    ady = ay - dy
+    bdx = bx - dx
+    bdy = by - dy
+    cdx = cx - dx
+    cdy = cy - dy
+    adw = aw - dw
+    bdw = bw - dw
+    cdw = cw - dw
+
+    bcdet = bdx * cdy - cdx * bdy
+    cadet = cdx * ady - adx * cdy
+    abdet = adx * bdy - bdx * ady
+    asquare = adx * adx + ady * ady
+    bsquare = bdx * bdx + bdy * bdy
+    csquare = cdx * cdx + cdy * cdy
+
+    det = (asquare - adw) * bcdet + (bsquare - bdw) * cadet + (csquare - cdw) * abdet
+    permanent = ((abs(bdx * cdy) + abs(cdx * bdy)) * (asquare + abs(adw)) +
+                 (abs(cdx * ady) + abs(adx * cdy)) * (bsquare + abs(bdw)) +
+                 (abs(adx * bdy) + abs(bdx * ady)) * (csquare + abs(cdw)))
+    if abs(det) > INPOWER_BOUND * permanent:
+        return det
+
+    return ratioToFloat(*inpowerRatio(ax, ay, aw, bx, by, bw, cx, cy, cw, dx, dy, dw))
+
+
+def inpowerRatio(ax, ay, aw, bx, by, bw, cx, cy, cw, dx, dy, dw) -> tuple[int, int]:
+    """exact inpower as integer numerator and positive denominator"""
+    (ax, ay, bx, by, cx, cy, dx, dy), scale = integers((ax, ay, bx, by, cx, cy, dx, dy))
+    (aw, bw, cw, dw), weightScale = integers((aw, bw, cw, dw))
+    adx, ady, adw = ax - dx, ay - dy, aw - dw
+    bdx, bdy, bdw = bx - dx, by - dy, bw - dw
+    cdx, cdy, cdw = cx - dx, cy - dy, cw - dw
+
+    # lifted values over scale ** 2 * weightScale
+    square = scale * scale
+    return (((adx * adx + ady * ady) * weightScale - adw * square) * (bdx * cdy - cdx * bdy) +
+            ((bdx * bdx + bdy * bdy) * weightScale - bdw * square) * (cdx * ady - adx * cdy) +
+            ((cdx * cdx + cdy * cdy) * weightScale - cdw * square) * (adx * bdy - bdx * ady)), \
+        square * square * weightScale
+
+
+def inpowerExact(ax, ay, aw, bx, by, bw, cx, cy, cw, dx, dy, dw) -> Fraction:
+    return Fraction(*inpowerRatio(ax, ay, aw, bx, by, bw, cx, cy, cw, dx, dy, dw))
+
+
+def circumcenter(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> tuple[float, float]:
+    """
+    center of circle through a, b, c - computed relative to a, with orientation from orient2d of given
+    points (not of the rounded differences), so it is finite for every triangle that is not exactly degenerate
+    """
+    d = 2 * orient2d(ax, ay, bx, by, cx, cy)
+    if d == 0:
+        raise ZeroDivisionError("points are collinear")
+    bx -= ax
+    by -= ay
+    cx -= ax
+    cy -= ay
+
+    b2 = bx * bx + by * by
+    c2 = cx * cx + cy * cy
+    return ax + (cy * b2 - by * c2) / d, ay + (bx * c2 - cx * b2) / d
+
+
+def powerCenter(ax: float, ay: float, aw: float, bx: float, by: float, bw: float,
+                cx: float, cy: float, cw: float) -> tuple[float, float]:
+    """point with equal power distance to weighted a, b, c (circumcenter if weights are equal)"""
+    d = 2 * orient2d(ax, ay, bx, by, cx, cy)
+    if d == 0:
+        raise ZeroDivisionError("points are collinear")
+    bx -= ax
+    by -= ay
+    cx -= ax
+    cy -= ay
+
+    b2 = bx * bx + by * by - (bw - aw)
+    c2 = cx * cx + cy * cy - (cw - aw)
+    return ax + (cy * b2 - by * c2) / d, ay + (bx * c2 - cx * b2) / d
+
+
+if __name__ == '__main__':
+    # points on line y = x, too close for float determinant to get the sign right
+    print(orient2d(0.5, 0.5, 12.0, 12.0, 24.0, 24.0), orient2dExact(0.5, 0.5, 12.0, 12.0, 24.0, 24.0))
+    print(orient2d(0.5 + 2 ** -50, 0.5, 12.0, 12.0, 24.0, 24.0))
+    print(incircle(0, 5, 5, 0, 0, -5, 3, 4), incircle(0, 5, -5, 0, 0, -5, 3, 4 - 2 ** -50))
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# both constructions (and the benchmark) use flat imports from their directories, shared geometry package
+# is imported from the repository root when it is not installed
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ('Fortune', 'Delaunay', 'benchmark'):
+    sys.path.insert(0, os.path.join(ROOT, directory))
+sys.path.insert(0, ROOT)
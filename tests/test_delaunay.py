@@ -0,0 +1,166 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import delaunay
+from benchmark import generate
+from dynamic import DynamicVoronoi
+from geometry.predicates import orient2d, incircle, inpower
+
+
+def area(a, b, c) -> Fraction:
+    """exact doubled signed area of triangle abc"""
+    (ax, ay), (bx, by), (cx, cy) = ((Fraction(x), Fraction(y)) for x, y in (a, b, c))
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def convex_hull(points) -> list[tuple[float, float]]:
+    """vertices of convex hull in counter clockwise order, collinear points left out (monotone chain)"""
+    points = sorted(set(map(tuple, points.tolist())))
+
+    def chain(sequence):
+        result = []
+        for p in sequence:
+            while len(result) >= 2 and orient2d(*result[-2], *result[-1], *p) <= 0:
+                result.pop()
+            result.append(p)
+        return result[:-1]
+
+    return chain(points) + chain(points[::-1])
+
+
+def boundary_points(points) -> int:
+    """number of points lying on boundary of convex hull, collinear ones included"""
+    hull = convex_hull(points)
+    return sum(any(orient2d(*hull[i - 1], *hull[i], *p) == 0 for i in range(len(hull)))
+               for p in set(map(tuple, points.tolist())))
+
+
+def check_triangulation(points, triangles, neighbours, weights=None, present=None):
+    for t in triangles.tolist():
+        assert orient2d(*points[t[0]], *points[t[1]], *points[t[2]]) > 0
+
+    # every edge is locally Delaunay (regular)
+    for t, ngh in zip(triangles.tolist(), neighbours.tolist()):
+        a, b, c = t
+        for u in ngh:
+            if u == -1:
+                continue
+            d = next(v for v in triangles[u].tolist() if v not in t)
+            if weights is None:
+                assert incircle(*points[a], *points[b], *points[c], *points[d]) <= 0
+            else:
+                assert inpower(*points[a], weights[a], *points[b], weights[b], *points[c], weights[c],
+                               *points[d], weights[d]) <= 0
+
+    # triangles cover whole convex hull
+    hull = convex_hull(points if present is None else points[present])
+    hull_area = sum(area(hull[0], hull[i], hull[i + 1]) for i in range(1, len(hull) - 1))
+    assert sum(area(*points[t]) for t in triangles.tolist()) == hull_area
+
+
+rng = np.random.default_rng(0)
+DISTRIBUTIONS = {
+    'uniform': rng.uniform(0, 1000, (2000, 2)),
+    'elongated': np.column_stack((rng.normal(0, 1000, 2000), rng.normal(0, 1, 2000))),
+    'clustered': rng.uniform(0, 1000, (20, 2))[rng.integers(0, 20, 2000)] + rng.normal(0, 5, (2000, 2)),
+    'grid': np.column_stack((np.arange(900) % 30, np.arange(900) // 30)).astype(float),
+    'circle': np.column_stack((np.cos(np.arange(500)), np.sin(np.arange(500)))),
+    'parabola': np.column_stack((np.linspace(-1, 1, 300), np.linspace(-1, 1, 300) ** 2)),
+}
+
+
+@pytest.mark.parametrize('order', [None, 'hilbert', 'brio'])
+@pytest.mark.parametrize('name', list(DISTRIBUTIONS))
+def test_hull_is_complete(name, order):
+    points = DISTRIBUTIONS[name]
+    triangles, neighbours = delaunay.delaunay(points, order)
+
+    check_triangulation(points, triangles, neighbours)
+    # triangulation of n points with h of them on boundary of convex hull has 2n - h - 2 triangles
+    assert len(triangles) == 2 * len(points) - boundary_points(points) - 2
+
+
+@pytest.mark.parametrize('name', ['uniform', 'elongated', 'grid'])
+def test_regular_hull_is_complete(name):
+    points = DISTRIBUTIONS[name]
+    weights = np.random.default_rng(1).uniform(0, 5, len(points))
+    triangles, neighbours = delaunay.delaunay(points, weights=weights)
+
+    check_triangulation(points, triangles, neighbours, weights)
+
+
+def test_hull_after_removals():
+    points = DISTRIBUTIONS['uniform'][:400]
+    triangulation = delaunay.triangulate(points)
+    removed = set(np.random.default_rng(2).choice(len(points), 150, replace=False).tolist())
+    for v in removed:
+        triangulation.remove_point(v)
+
+    V = triangulation.vertex_table()
+    N = triangulation.neighbour_table()
+    keep = np.flatnonzero((V >= 0).all(axis=1) & (V < triangulation.n).all(axis=1))
+    new_index = np.full(len(V), -1)
+    new_index[keep] = np.arange(len(keep))
+    neighbours = np.where(N[keep] >= 0, new_index[N[keep]], -1)
+
+    rest = np.array(sorted(set(range(len(points))) - removed))
+    check_triangulation(points, V[keep], neighbours, present=rest)
+    assert len(keep) == 2 * len(rest) - boundary_points(points[rest]) - 2
+
+
+def test_dynamic_duplicate_site():
+    points = DISTRIBUTIONS['uniform'][:100]
+    voronoi = DynamicVoronoi(points)
+
+    assert voronoi.add_site(*points[10]) == 10
+    i = voronoi.add_site(500.5, 500.5)
+    assert voronoi.add_site(500.5, 500.5) == i
+    assert len(voronoi.cell(i)) >= 3
+
+    voronoi.remove_site(i)
+    j = voronoi.add_site(500.5, 500.5)
+    assert j != i and len(voronoi.cell(j)) >= 3
+
+
+def test_nearly_collinear_centers():
+    points = generate('collinear', 100, 0)
+    triangles, neighbours = delaunay.delaunay(points)
+    check_triangulation(points, triangles, neighbours)
+    assert np.isfinite(delaunay.circumcenters(points, triangles)).all()
+
+    voronoi = DynamicVoronoi(points)
+    live = np.flatnonzero((voronoi.vertex_table() >= 0).all(axis=1))
+    assert np.isfinite(np.frombuffer(voronoi.centerX)[live]).all()
+
+
+def check_cells(voronoi, sites):
+    (left, bottom), (right, top) = voronoi.lower_left, voronoi.upper_right
+    total = 0.0
+    for i in sites:
+        cell = voronoi.cell(i)
+        assert len(cell) >= 3
+        # convex, counter clockwise, site inside
+        for k in range(len(cell)):
+            assert orient2d(*cell[k - 2], *cell[k - 1], *cell[k]) >= -1e-9 * (right - left) * (top - bottom)
+            assert orient2d(*cell[k - 1], *cell[k], voronoi.x[i], voronoi.y[i]) > 0
+        total += sum(cell[k - 1][0] * cell[k][1] - cell[k][0] * cell[k - 1][1] for k in range(len(cell))) / 2
+    # cells cover the whole box
+    assert total == pytest.approx((right - left) * (top - bottom))
+
+
+def test_dynamic_cells():
+    points = np.random.default_rng(0).uniform(0, 1000, (300, 2))
+    voronoi = DynamicVoronoi(points)
+    check_cells(voronoi, range(300))
+
+    for i in range(0, 300, 3):
+        voronoi.remove_site(i)
+    added = [voronoi.add_site(x, y) for x, y in np.random.default_rng(1).uniform(0, 1000, (50, 2)).tolist()]
+    check_cells(voronoi, [i for i in range(300) if i % 3] + added)
+
+
+def test_dynamic_cells_of_collinear_sites():
+    voronoi = DynamicVoronoi(np.array([[0, 0], [1, 1], [2, 2], [3, 3]], dtype=float))
+    check_cells(voronoi, range(4))
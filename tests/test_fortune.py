@@ -0,0 +1,322 @@
+import os
+from random import Random
+
+import numpy as np
+import pytest
+
+import delaunay
+from analytics import cellAreas, cellCentroids, neighbourGraph
+from batch import batchBounds, solveBatch
+from benchmark import generate
+from dataTypes import Point
+from diagramFile import saveDiagram, loadDiagram
+from eventQueue import EventQueue, CIRCLE
+from geometry.predicates import orient2d
+from instrumentation import SweepStats
+from lloyd import LloydRelaxation
+from locator import SiteLocator
+from parallel import solveParallel
+from streaming import StreamingVoronoi, writeSorted, binaryBounds, readBinary, loadStreamed
+from voronoiFortunemethod import Voronoi, getBounds
+
+
+def test_bounds_margin_uses_width():
+    # y values well above x range, box must still contain every point with 10% margin on each side
+    points = [Point(0, 100), Point(1, 101), Point(0.5, 100.5)]
+    lowerLeft, upperRight = getBounds(points)
+
+    assert (lowerLeft.x, lowerLeft.y) == (-0.1, 99.9)
+    assert (upperRight.x, upperRight.y) == (1.1, 101.1)
+
+
+def test_batch_bounds_match_get_bounds():
+    # second set has y values well above its x range
+    coords = np.array([[5, 60], [20, 10], [40, 80], [0, 100], [1, 101], [0.5, 100.5]], dtype=float)
+    offsets = np.array([0, 3, 3, 6])
+    bounds = batchBounds(offsets, coords)
+
+    for i, (start, end) in enumerate(zip(offsets[:-1], offsets[1:])):
+        if start == end:
+            assert bounds[i].tolist() == [0, 0, 0, 0]
+            continue
+        lowerLeft, upperRight = getBounds([Point(x, y) for x, y in coords[start:end].tolist()])
+        assert bounds[i].tolist() == [lowerLeft.x, lowerLeft.y, upperRight.x, upperRight.y]
+
+
+def test_streaming_matches_voronoi(tmp_path):
+    random = Random(1)
+    coords = [(random.uniform(0, 100), random.uniform(0, 100)) for _ in range(300)]
+    path = os.path.join(tmp_path, 'sites.bin')
+    writeSorted(coords, path)
+    bounds = binaryBounds(path)
+
+    StreamingVoronoi(readBinary(path), bounds, os.path.join(tmp_path, 'diagram')).solve()
+    sites, vertices, halfEdges = loadStreamed(os.path.join(tmp_path, 'diagram'))
+    voronoi = Voronoi({Point(x, y) for x, y in coords}, bounds=bounds)
+    voronoi.solve()
+
+    assert len(sites) == len(coords)
+    assert len(halfEdges) == voronoi.diagram.halfEdgeCount()
+    expected = np.column_stack((voronoi.diagram.vertexX, voronoi.diagram.vertexY))
+    assert np.array_equal(np.unique(vertices.round(9), axis=0), np.unique(expected.round(9), axis=0))
+
+
+def test_batch_matches_voronoi():
+    random = Random(2)
+    counts = [random.randint(3, 30) for _ in range(20)]
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    coords = np.array([(random.uniform(0, 100), random.uniform(0, 100)) for _ in range(offsets[-1])])
+    batch = solveBatch(offsets, coords, workers=1, chunkSites=100)
+
+    for i in range(len(counts)):
+        voronoi = Voronoi({Point(x, y) for x, y in coords[offsets[i]:offsets[i + 1]].tolist()},
+                          bounds=batch.getBounds(i))
+        voronoi.solve()
+        diagram = batch.diagram(i)
+        assert diagram.halfEdgeCount() == voronoi.diagram.halfEdgeCount()
+        assert sorted(zip(diagram.vertexX, diagram.vertexY)) == \
+            sorted(zip(voronoi.diagram.vertexX, voronoi.diagram.vertexY))
+
+
+def test_half_edges_without_box_intersection_stay_open(monkeypatch):
+    test = [(5, 60), (20, 10), (40, 80), (60, 40), (80, 75), (75, 20)]
+    closed = Voronoi({Point(x, y) for x, y in test})
+    closed.solve()
+    voronoi = Voronoi({Point(x, y) for x, y in test})
+    monkeypatch.setattr(voronoi, 'getIntersectionWithBox', lambda point, direction: None)
+    voronoi.solve()
+
+    assert voronoi.diagram.vertexCount() < closed.diagram.vertexCount()
+    assert voronoi.diagram.edgeEnd.count(-1) > closed.diagram.edgeEnd.count(-1)
+
+
+def test_lloyd_keeps_points_hashed():
+    random = Random(3)
+    relaxation = LloydRelaxation([(random.uniform(0, 100), random.uniform(0, 100)) for _ in range(50)])
+    relaxation.run(3)
+
+    points = relaxation.voronoi.points
+    assert len(points) == 50
+    assert all(Point(x, y) in points for x, y in relaxation.coordinates())
+
+
+@pytest.mark.parametrize('cut', [1, 8, 100])
+def test_truncated_diagram_file(tmp_path, cut):
+    voronoi = Voronoi({Point(x, y) for x, y in [(5, 60), (20, 10), (40, 80), (60, 40), (80, 75), (75, 20)]})
+    voronoi.solve()
+    path = os.path.join(tmp_path, 'diagram.bin')
+    saveDiagram(voronoi.diagram, path)
+    assert loadDiagram(path).vertexX.tolist() == list(voronoi.diagram.vertexX)
+
+    with open(path, 'rb') as file:
+        data = file.read()
+    with open(path, 'wb') as file:
+        file.write(data[:-cut])
+    with pytest.raises(ValueError):
+        loadDiagram(path)
+
+
+@pytest.mark.parametrize('n', [100, 2000])
+def test_nearly_collinear_sites(n):
+    # differences of coordinates rounded to exactly collinear ones, while the sites are not collinear
+    coords = generate('collinear', n, 0)
+    voronoi = Voronoi({Point(x, y) for x, y in coords.tolist()})
+    voronoi.solve()
+
+    assert voronoi.diagram.siteCount() == n
+    assert np.isfinite(voronoi.diagram.vertexX).all() and np.isfinite(voronoi.diagram.vertexY).all()
+
+
+def halfEdges(diagram):
+    """half edges as (site, twin site, start, end) with coordinates of ends, independent of numbering"""
+    def vertex(i):
+        return None if i == -1 else (diagram.vertexX[i], diagram.vertexY[i])
+
+    return sorted(((diagram.edgeSite[i], -1 if diagram.edgeTwin[i] == -1 else diagram.edgeSite[diagram.edgeTwin[i]],
+                    vertex(diagram.edgeStart[i]), vertex(diagram.edgeEnd[i])) for i in range(diagram.halfEdgeCount())),
+                  key=repr)
+
+
+@pytest.mark.parametrize('distribution', ['uniform', 'clustered', 'grid'])
+def test_parallel_matches_serial(distribution):
+    points = {Point(x, y) for x, y in generate(distribution, 900, 0).tolist()}
+    voronoi = Voronoi(points)
+    voronoi.solve()
+    diagram = solveParallel(points, workers=2)
+
+    assert (diagram.siteX, diagram.siteY) == (voronoi.diagram.siteX, voronoi.diagram.siteY)
+    assert halfEdges(diagram) == halfEdges(voronoi.diagram)
+    # vertices with equal coordinates are merged by stitch
+    assert sorted(set(zip(diagram.vertexX, diagram.vertexY))) == \
+        sorted(set(zip(voronoi.diagram.vertexX, voronoi.diagram.vertexY)))
+
+
+@pytest.mark.parametrize('distribution', ['uniform', 'clustered', 'grid'])
+def test_locator_matches_brute_force(distribution):
+    coords = generate(distribution, 500, 0)
+    voronoi = Voronoi({Point(x, y) for x, y in coords.tolist()})
+    voronoi.solve()
+    locator = SiteLocator(voronoi.diagram)
+    sites = np.column_stack((voronoi.diagram.siteX, voronoi.diagram.siteY))
+
+    low, high = sites.min(axis=0), sites.max(axis=0)
+    queries = np.random.default_rng(1).uniform(low - (high - low) / 10, high + (high - low) / 10, (300, 2))
+    queries = np.concatenate((queries, sites[:50]))
+    nearest = ((queries[:, None, :] - sites[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+
+    def distance(found):
+        return ((queries - sites[found]) ** 2).sum(axis=1)
+
+    # equally near sites (grid) may be returned instead of each other
+    assert np.array_equal(distance(np.array([locator.query(x, y) for x, y in queries.tolist()])), nearest)
+    assert np.array_equal(distance(locator.queryMany(queries)), nearest)
+
+
+def signedArea(polygon) -> float:
+    return sum(polygon[k - 1][0] * polygon[k][1] - polygon[k][0] * polygon[k - 1][1] for k in range(len(polygon))) / 2
+
+
+@pytest.mark.parametrize('distribution', ['uniform', 'clustered', 'grid'])
+def test_cell_polygons_cover_box(distribution):
+    voronoi = Voronoi({Point(x, y) for x, y in generate(distribution, 500, 0).tolist()})
+    voronoi.solve()
+    polygons = voronoi.getCellPolygons()
+    width = voronoi.upperRight.x - voronoi.lowerLeft.x
+    height = voronoi.upperRight.y - voronoi.lowerLeft.y
+
+    assert len(polygons) == 500
+    total = 0.0
+    for i in range(len(polygons)):
+        polygon = polygons.polygon(i)
+        area = signedArea(polygon)
+        assert area > 0
+        # convex - every corner turns left (collinear points allowed, up to rounding)
+        for k in range(len(polygon)):
+            assert orient2d(*polygon[k - 2], *polygon[k - 1], *polygon[k]) >= -1e-9 * width * height
+        total += area
+    assert total == pytest.approx(width * height)
+
+
+def test_cell_polygon_of_single_site_is_box():
+    voronoi = Voronoi({Point(3, 4)}, bounds=(Point(0, 0), Point(10, 5)))
+    voronoi.solve()
+
+    assert voronoi.getCellPolygons().polygon(0) == [(0, 0), (10, 0), (10, 5), (0, 5)]
+
+
+def test_neighbour_graph_is_delaunay():
+    coords = np.random.default_rng(5).uniform(0, 1000, (500, 2))
+    voronoi = Voronoi({Point(x, y) for x, y in coords.tolist()})
+    voronoi.solve()
+    offsets, adjacent = neighbourGraph(voronoi.diagram)
+
+    # sites of diagram are numbered by iteration order of the set, delaunay numbers them like coords
+    index = {site: i for i, site in enumerate(zip(voronoi.diagram.siteX, voronoi.diagram.siteY))}
+    order = np.array([index[site] for site in map(tuple, coords.tolist())])
+    triangles, _ = delaunay.delaunay(coords)
+    expected = {(order[a], order[b]) for t in triangles.tolist() for a, b in ((t[0], t[1]), (t[1], t[2]), (t[2], t[0]))}
+    expected |= {(b, a) for a, b in expected}
+
+    graph = {(i, j) for i in range(500) for j in adjacent[offsets[i]:offsets[i + 1]].tolist()}
+    assert graph == expected
+
+
+def test_cell_areas_and_centroids():
+    voronoi = Voronoi({Point(x, y) for x, y in generate('clustered', 500, 0).tolist()})
+    voronoi.solve()
+    polygons = voronoi.getCellPolygons()
+    areas = cellAreas(polygons)
+    centroids = cellCentroids(polygons)
+
+    for i in range(len(polygons)):
+        polygon = polygons.polygon(i)
+        assert areas[i] == pytest.approx(signedArea(polygon))
+        for k in range(len(polygon)):
+            assert orient2d(*polygon[k - 1], *polygon[k], *centroids[i]) > 0
+
+
+def test_sweep_stats_counters():
+    # six sites with equal y give one arc each, site below splits one of them into three
+    points = {Point(x, 10) for x in range(6)} | {Point(2.5, 0)}
+    stats = SweepStats()
+    voronoi = Voronoi(points, stats=stats)
+    voronoi.solve()
+    report = stats.report()
+
+    assert report['siteEvents'] == 7
+    assert report['maxBeachLine'] == 8
+    assert report['getNodeAboveCalls'] == 6
+    assert report['circleEvents'] == 5
+
+
+def test_sweep_stats_callback():
+    reports = []
+    coords = generate('uniform', 300, 2).tolist()
+    voronoi = Voronoi({Point(x, y) for x, y in coords}, stats=SweepStats(reports.append))
+    voronoi.solve()
+    plain = Voronoi({Point(x, y) for x, y in coords})
+    plain.solve()
+
+    assert len(reports) == 1
+    report = reports[0]
+    assert report['siteEvents'] == 300
+    assert report['circleEvents'] <= 2 * 300
+    assert 0 < report['maxBeachLine'] <= 2 * 300 - 1
+    assert report['solveTime'] >= report['getNodeAboveTime'] > 0
+    # instrumented sweep builds the same diagram
+    polygons, expected = voronoi.getCellPolygons(), plain.getCellPolygons()
+    assert [polygons.polygon(i) for i in range(300)] == [expected.polygon(i) for i in range(300)]
+
+
+def test_event_queue_order():
+    queue = EventQueue()
+    a, b, c = Point(0, 5), Point(1, 5), Point(2, 5)
+    queue.put(b, 5)
+    queue.put(Point(0, 9), 9)
+    queue.put(a, 5)
+    queue.putAll([Point(3, 1), c, Point(-1, 1)])
+
+    assert queue.peekY() == 9
+    assert queue.get()[1].y == 9
+    # equal y - put events in insertion order, then putAll events (sorted by x)
+    assert [queue.get()[1] for _ in range(3)] == [b, a, c]
+    assert [queue.get()[1].x for _ in range(2)] == [-1, 3]
+    assert queue.empty()
+
+
+def test_event_queue_cancel():
+    queue = EventQueue()
+    handles = [queue.put(Point(i, i), i) for i in range(10)]
+
+    assert queue.get() == (CIRCLE, Point(9, 9))
+    # popped handle is no longer in heap, cancelling it must not count as removed
+    queue.cancel(handles[9])
+    queue.cancel(None)
+    assert queue.removedCount == 0 and len(queue) == 9
+
+    queue.cancel(handles[8])
+    queue.cancel(handles[8])
+    assert queue.removedCount == 1 and len(queue) == 8
+    assert queue.peekY() == 7
+    assert queue.removedCount == 0 and len(queue.heap) == 8
+
+    for i in range(4):
+        queue.cancel(handles[i])
+    assert len(queue.heap) == 8 and queue.removedCount == 4
+    # fifth tombstone is more than half of heap
+    queue.cancel(handles[4])
+    assert len(queue.heap) == 3 and queue.removedCount == 0
+    assert [queue.get()[1].y for _ in range(3)] == [7, 6, 5]
+    assert queue.empty() and len(queue) == 0
+
+
+def test_event_queue_compact():
+    queue = EventQueue()
+    handles = [queue.put(Point(i, 0), 0) for i in range(6)]
+    queue.cancel(handles[1])
+    queue.cancel(handles[3])
+    assert len(queue.heap) == 6 and queue.removedCount == 2
+    queue.compact()
+
+    assert queue.removedCount == 0 and len(queue.heap) == 4
+    assert [queue.get()[1].x for _ in range(4)] == [0, 2, 4, 5]